@@ -4,33 +4,68 @@ Provides common functionality for different interface types.
 """
 
 import logging
+import os
 from abc import ABC, abstractmethod
+from typing import Optional
 from src.agents.custom.agent import Agent
+from src.agents.custom.backlog_review import BacklogReviewer
+from src.agents.custom.profiling import RunProfiler
+from src.agents.custom.resilience import ResiliencePolicy
 from src.agents.custom.tools.airtable_create_record_tool import AirtableCreateRecordTool
 from src.agents.custom.tools.airtable_get_all_records_tool import AirtableGetAllRecordsTool
 from src.agents.custom.tools.airtable_update_record_tool import AirtableUpdateRecordTool
 from src.agents.custom.tools.airtable_delete_record_tool import AirtableDeleteRecordTool
+from src.agents.custom.tools.airtable_search_records_tool import AirtableSearchRecordsTool
+from src.agents.custom.tools.airtable_review_backlog_tool import AirtableReviewBacklogTool
 
 
 class BaseInterface(ABC):
     """Base class for Agent Smith interfaces."""
     
-    def __init__(self, model: str = "gpt-4o", log_level: int = logging.WARNING):
+    def __init__(
+        self,
+        model: str = "gpt-4o",
+        log_level: int = logging.WARNING,
+        resilience: Optional[ResiliencePolicy] = None,
+        profiler: Optional[RunProfiler] = None,
+    ):
         """Initialize the base interface with Agent Smith."""
         # Set up logging
         logging.getLogger('src.agents.custom.agent').setLevel(log_level)
         
+        # Profiling can be switched on at runtime, so keep a (disabled) profiler around
+        self.profiler = profiler or RunProfiler(enabled=False)
+        
+        # Speculatively fetch the backlog on every run, since the agent is told to check it first.
+        # AGENT_BACKLOG_PREFETCH: 'answer' (default), 'context', or 'off'
+        prefetch_mode = os.getenv('AGENT_BACKLOG_PREFETCH', 'answer').strip().lower()
+        get_all_records_tool = AirtableGetAllRecordsTool()
+        review_backlog_tool = AirtableReviewBacklogTool()
+        
         # Initialize the agent
         self.agent = Agent(
             model=model,
             system_message=self._get_system_message(),
             tools=[
                 AirtableCreateRecordTool(), 
-                AirtableGetAllRecordsTool(), 
+                get_all_records_tool, 
                 AirtableUpdateRecordTool(), 
-                AirtableDeleteRecordTool()
+                AirtableDeleteRecordTool(),
+                AirtableSearchRecordsTool(),
+                review_backlog_tool
             ],
+            prefetch_tool=None if prefetch_mode == 'off' else get_all_records_tool.name,
+            prefetch_mode='answer' if prefetch_mode == 'off' else prefetch_mode,
+            resilience=resilience,
+            profiler=self.profiler,
         )
+        
+        # Large backlogs don't fit one context, so summaries are built chunk by chunk
+        self.backlog_reviewer = BacklogReviewer(
+            self.agent,
+            max_concurrency=int(os.getenv('BACKLOG_REVIEW_CONCURRENCY', '4')),
+        )
+        review_backlog_tool.reviewer = self.backlog_reviewer
     
     def _get_system_message(self) -> str:
         """Get the system message for Agent Smith."""
@@ -45,7 +80,9 @@ class BaseInterface(ABC):
    - ❓ Remove tasks with incomplete or unclear information
 
 3. **🛠️ Available Tools**: Use these tools efficiently:
-   - `airtable_get_all_records`: Review the current backlog
+   - `airtable_get_all_records`: Review the current backlog (large backlogs are truncated)
+   - `review_backlog`: Counts by status, overdue tasks and cleanup candidates for the whole backlog, at any size (use it for cleanup requests)
+   - `search_tasks`: Find specific tasks by keywords in their name or notes (much cheaper than reviewing the whole backlog)
    - `create_airtable_record`: Add new tasks with proper fields (Name, Notes, Status, Due date/time)
    - `update_airtable_record`: Modify existing tasks (change status, update notes, set due dates, etc.)
    - `delete_airtable_record`: Remove completed or unnecessary tasks
@@ -68,11 +105,21 @@ Be helpful, efficient, and maintain a clean, organized task management system wi
     
     def get_backlog_summary(self) -> str:
         """Get an engaging backlog summary."""
-        return self.agent.run(
+        review = self.backlog_reviewer.review(
             "🔍 Please review my current backlog and provide an engaging summary with emojis! "
             "Include: 📊 task counts by status, ⏰ any overdue items, and 🧹 suggestions for cleanup or organization. "
             "Make it visually appealing and easy to scan!"
         )
+        return review.summary
+    
+    def toggle_profiling(self) -> str:
+        """Switch run profiling on or off and describe the new state."""
+        if self.profiler.toggle():
+            return (
+                f"🔬 Profiling enabled: every {self.profiler.every_n} run(s), "
+                f"reports in `{self.profiler.output_dir}`"
+            )
+        return "🔬 Profiling disabled"
     
     def process_user_input(self, user_input: str) -> str:
         """Process user input and return Agent Smith's response."""
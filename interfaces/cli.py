@@ -20,15 +20,18 @@ class CLIInterface(BaseInterface):
             self.send_message(f"📋 Backlog Summary:\n{backlog_summary}")
         
         print("\n" + "="*50)
-        print("Ready for your commands! (Type 'quit' or 'exit' to end)")
+        print("Ready for your commands! (Type 'quit' or 'exit' to end, '/profile' to toggle profiling)")
         
         # Interactive loop
         user_in = input("> ")
         user_in = user_in.strip()
         while user_in not in ("quit", "exit"):
-            result = self.process_user_input(user_in)
-            if result:
-                self.send_message(result)
+            if user_in == "/profile":
+                self.send_message(self.toggle_profiling())
+            else:
+                result = self.process_user_input(user_in)
+                if result:
+                    self.send_message(result)
             user_in = input("> ")
             user_in = user_in.strip()
     
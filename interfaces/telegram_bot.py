@@ -8,35 +8,68 @@ To use this interface:
 3. Run: python interfaces/telegram_bot.py
 """
 
+import asyncio
+import logging
 import os
+import re
+import tempfile
 from typing import Optional
 from .base import BaseInterface
+from .telegram_delivery import TelegramOutbox
+from src.agents.custom.resilience import ResiliencePolicy
 
+import httpx
 from telegram import Update
 from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
 
+import src.services.airtable_service as airtable_service
+
+# Files are spooled to disk past this size while streaming from Telegram
+_SPOOL_MAX_MEMORY = 512 * 1024
+_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+_RECORD_ID_PATTERN = re.compile(r"\brec[A-Za-z0-9]{14}\b")
+
+logger = logging.getLogger(__name__)
+
 class TelegramInterface(BaseInterface):
     """Telegram bot interface for Agent Smith."""
     
     def __init__(self, bot_token: Optional[str] = None, **kwargs):
         """Initialize Telegram interface."""
+        # Chat replies are latency sensitive, so hedge slow model calls by default
+        kwargs.setdefault('resilience', ResiliencePolicy(hedge=True))
         super().__init__(**kwargs)
         self.bot_token = bot_token or os.getenv('TELEGRAM_BOT_TOKEN')
         if not self.bot_token:
             raise ValueError("TELEGRAM_BOT_TOKEN environment variable or bot_token parameter required")
         
+        # Limit concurrent attachment transfers so large files can't starve other chats
+        self._upload_slots = asyncio.Semaphore(int(os.getenv('TELEGRAM_MAX_CONCURRENT_UPLOADS', '3')))
+        
         self.application = Application.builder().token(self.bot_token).build()
+        self.outbox = TelegramOutbox(self.application.bot)
         self._setup_handlers()
     
     def _setup_handlers(self):
         """Set up Telegram bot command and message handlers."""
+        # Every handler runs with block=False: replies wait for paced delivery and agent
+        # runs take seconds, and neither should hold up updates from other chats
+        
         # Commands
-        self.application.add_handler(CommandHandler("start", self._start_command))
-        self.application.add_handler(CommandHandler("help", self._help_command))
-        self.application.add_handler(CommandHandler("summary", self._summary_command))
+        self.application.add_handler(CommandHandler("start", self._start_command, block=False))
+        self.application.add_handler(CommandHandler("help", self._help_command, block=False))
+        self.application.add_handler(CommandHandler("summary", self._summary_command, block=False))
+        self.application.add_handler(CommandHandler("profile", self._profile_command, block=False))
         
         # Regular messages
-        self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self._handle_message))
+        self.application.add_handler(
+            MessageHandler(filters.TEXT & ~filters.COMMAND, self._handle_message, block=False)
+        )
+        
+        # Photos and documents
+        self.application.add_handler(
+            MessageHandler(filters.PHOTO | filters.Document.ALL, self._handle_attachment, block=False)
+        )
     
     async def _start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command."""
@@ -64,6 +97,7 @@ Just send me a message to get started! 🚀"""
 /start - Welcome message and backlog summary
 /summary - Get current backlog overview  
 /help - Show this help message
+/profile - Toggle performance profiling of agent runs
 
 **Natural Language Examples:**
 • "Create a new task to update documentation"
@@ -73,6 +107,10 @@ Just send me a message to get started! 🚀"""
 • "Clean up my backlog"
 • "What's overdue?"
 
+**Attachments:**
+📎 Send a photo or file to create a task from it (the caption becomes the task name)
+🔗 Put a record ID (recXXXXXXXXXXXXXX) in the caption to attach it to an existing task
+
 **Tips:**
 ✨ I understand natural language - just tell me what you need!
 📊 I'll automatically suggest cleanup and organization improvements
@@ -85,8 +123,9 @@ Send me any message to get started! 🚀"""
     async def _summary_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /summary command."""
         try:
-            await update.message.reply_text("🔍 Reviewing your backlog...")
-            summary = self.get_backlog_summary()
+            await self.send_message_async(update, "🔍 Reviewing your backlog...")
+            # The review blocks on OpenAI and Airtable, so keep it off the event loop
+            summary = await asyncio.to_thread(self.get_backlog_summary)
             if summary:
                 await self.send_message_async(update, f"📋 **Backlog Summary:**\n{summary}")
             else:
@@ -94,6 +133,10 @@ Send me any message to get started! 🚀"""
         except Exception as e:
             await self.send_message_async(update, f"❌ Error getting summary: {str(e)}")
     
+    async def _profile_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /profile command."""
+        await self.send_message_async(update, self.toggle_profiling())
+    
     async def _handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle regular text messages."""
         user_message = update.message.text
@@ -102,8 +145,8 @@ Send me any message to get started! 🚀"""
             # Show typing indicator
             await context.bot.send_chat_action(chat_id=update.effective_chat.id, action="typing")
             
-            # Process with Agent Smith
-            response = self.process_user_input(user_message)
+            # Process with Agent Smith, off the event loop so other chats keep being served
+            response = await asyncio.to_thread(self.process_user_input, user_message)
             
             if response:
                 await self.send_message_async(update, response)
@@ -113,15 +156,100 @@ Send me any message to get started! 🚀"""
         except Exception as e:
             await self.send_message_async(update, f"❌ Sorry, I encountered an error: {str(e)}")
     
+    async def _handle_attachment(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle photos and documents by streaming them into the Backlog's Attachments field."""
+        message = update.message
+        caption = (message.caption or "").strip()
+        
+        if message.document:
+            attachment = message.document
+            filename = attachment.file_name or f"document_{attachment.file_unique_id}"
+            content_type = attachment.mime_type or "application/octet-stream"
+        else:
+            attachment = message.photo[-1]  # Largest available size
+            filename = f"photo_{attachment.file_unique_id}.jpg"
+            content_type = "image/jpeg"
+        
+        if attachment.file_size and attachment.file_size > airtable_service.MAX_ATTACHMENT_BYTES:
+            limit_mb = airtable_service.MAX_ATTACHMENT_BYTES // (1024 * 1024)
+            await self.send_message_async(update, f"⚠️ **{filename}** is too large, attachments are limited to {limit_mb} MB")
+            return
+        
+        created_id = None
+        try:
+            async with self._upload_slots:
+                await context.bot.send_chat_action(chat_id=update.effective_chat.id, action="upload_document")
+                tg_file = await attachment.get_file()
+                
+                with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_MEMORY) as spool:
+                    size = await self._download_to(tg_file.file_path, spool)
+                    spool.seek(0)
+                    
+                    if match := _RECORD_ID_PATTERN.search(caption):
+                        record_id = match.group(0)
+                    else:
+                        record = await asyncio.to_thread(
+                            airtable_service.create_record,
+                            "Backlog",
+                            {"Name": caption or filename, "Notes": f"Created from {filename} sent via Telegram."},
+                        )
+                        record_id = created_id = record["id"]
+                    
+                    await asyncio.to_thread(
+                        airtable_service.upload_attachment,
+                        record_id, "Attachments", spool, size, filename, content_type,
+                    )
+            
+            await self.send_message_async(update, f"📎 Attached **{filename}** to task `{record_id}`")
+        except Exception as e:
+            if created_id:
+                # Don't leave an empty task behind for an attachment that never arrived
+                await self._discard_record(created_id)
+            await self.send_message_async(update, f"❌ Sorry, I couldn't attach {filename}: {str(e)}")
+    
+    async def _discard_record(self, record_id: str):
+        """Delete a task created for a failed attachment, logging rather than raising on failure."""
+        try:
+            await asyncio.to_thread(airtable_service.delete_record, "Backlog", record_id)
+        except Exception as e:
+            logger.error(f"Failed to delete task {record_id} after a failed attachment: {e}")
+    
+    async def _download_to(self, file_url: str, out) -> int:
+        """
+        Stream a Telegram file into a writable binary stream in chunks.
+        
+        Args:
+            file_url: Download URL of the file from get_file()
+            out: Binary stream to write to
+            
+        Returns:
+            Number of bytes written
+            
+        Raises:
+            ValueError: If the file turns out to exceed the attachment size limit
+            ConnectionError: If the download fails; the message never includes the
+                URL, since it contains the bot token
+        """
+        size = 0
+        try:
+            async with httpx.AsyncClient() as client:
+                async with client.stream("GET", file_url) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes(_DOWNLOAD_CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > airtable_service.MAX_ATTACHMENT_BYTES:
+                            raise ValueError("file exceeds the attachment size limit")
+                        out.write(chunk)
+        except httpx.HTTPStatusError as e:
+            raise ConnectionError(f"download from Telegram failed with HTTP {e.response.status_code}") from None
+        except httpx.HTTPError as e:
+            raise ConnectionError(f"download from Telegram failed ({type(e).__name__})") from None
+        return size
+    
     async def send_message_async(self, update: Update, message: str):
         """Send message via Telegram with proper formatting."""
-        # Split long messages if needed (Telegram has a 4096 character limit)
-        if len(message) > 4000:
-            parts = [message[i:i+4000] for i in range(0, len(message), 4000)]
-            for part in parts:
-                await update.message.reply_text(part, parse_mode='Markdown')
-        else:
-            await update.message.reply_text(message, parse_mode='Markdown')
+        # The outbox splits long messages at Markdown-safe boundaries and respects flood limits
+        await self.outbox.send(update.effective_chat.id, message)
     
     def send_message(self, message: str):
         """Synchronous send_message (not used in Telegram interface)."""
@@ -0,0 +1,266 @@
+"""
+Outbound message delivery for the Telegram interface.
+
+Splits long replies at Markdown-safe boundaries and sends them through per-chat
+queues that respect Telegram's flood limits.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from telegram import Bot
+from telegram.error import BadRequest, NetworkError, RetryAfter
+
+logger = logging.getLogger(__name__)
+
+# Telegram rejects messages longer than 4096 characters, counted in UTF-16 code units
+MAX_MESSAGE_LENGTH = 4096
+
+# Flood limits from the Bot API FAQ: ~30 messages/s overall, ~1/s per chat, 20/min per group
+GLOBAL_SEND_INTERVAL = 1 / 30
+PRIVATE_CHAT_SEND_INTERVAL = 1.0
+GROUP_CHAT_SEND_INTERVAL = 3.0
+
+_FENCE = "```"
+_INLINE_CODE_PATTERN = re.compile(r"`[^`]*`")
+
+
+def split_message(text: str, limit: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    Split a Markdown message into chunks that fit Telegram's length limit.
+
+    Splits prefer paragraph, then line, then word boundaries, never leave `*` or `_`
+    entities open at a chunk boundary when avoidable, and close and reopen code
+    blocks that have to be split.
+
+    Args:
+        text: The message to split
+        limit: Maximum length of a chunk
+
+    Returns:
+        List of chunks, in order
+    """
+    if _length(text) <= limit:
+        return [text]
+
+    pieces = []
+    for block in _blocks(text):
+        pieces.extend(_fit_block(block, limit))
+    return _pack(pieces, "\n\n", limit)
+
+
+def _length(text: str) -> int:
+    """Length as Telegram counts it, where emoji outside the BMP take two units."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _blocks(text: str) -> List[str]:
+    """
+    Split text into paragraphs, keeping fenced code blocks whole.
+
+    A code block is always a block of its own, even when no blank line separates it
+    from the surrounding text, so a split inside it can close and reopen the fence.
+    """
+    blocks, current, in_fence = [], [], False
+
+    def flush():
+        if current:
+            blocks.append("\n".join(current))
+            current.clear()
+
+    for line in text.split("\n"):
+        is_fence = line.strip().startswith(_FENCE)
+        if not in_fence and (is_fence or not line.strip()):
+            flush()
+            if not is_fence:
+                continue
+        current.append(line)
+        if is_fence:
+            in_fence = not in_fence
+            if not in_fence:
+                flush()
+    flush()
+    return blocks
+
+
+def _fit_block(block: str, limit: int) -> List[str]:
+    """Split a single paragraph or code block into pieces no longer than limit."""
+    if _length(block) <= limit:
+        return [block]
+
+    lines = block.split("\n")
+    if lines[0].strip().startswith(_FENCE):
+        opening = lines[0]
+        inner = lines[1:-1] if lines[-1].strip() == _FENCE else lines[1:]
+        # Leave room for the reopened fence and the closing one
+        inner_limit = limit - _length(opening) - len(_FENCE) - 2
+        return [f"{opening}\n{piece}\n{_FENCE}" for piece in _fit_lines(inner, inner_limit, balance=False)]
+
+    return _fit_lines(lines, limit, balance=True)
+
+
+def _fit_lines(lines: List[str], limit: int, balance: bool) -> List[str]:
+    """Pack lines into pieces no longer than limit, splitting overlong lines at spaces."""
+    pieces = []
+    for line in lines:
+        if _length(line) <= limit:
+            pieces.append(line)
+            continue
+        # Hard-split words by half the limit, so even all-emoji words fit
+        step = max(limit // 2, 1)
+        words = []
+        for word in line.split(" "):
+            words.extend(word[i:i + step] for i in range(0, max(len(word), 1), step))
+        pieces.extend(_pack(words, " ", limit, balance))
+    return _pack(pieces, "\n", limit, balance)
+
+
+def _pack(pieces: List[str], separator: str, limit: int, balance: bool = True) -> List[str]:
+    """
+    Greedily join pieces into chunks no longer than limit.
+
+    When a chunk has to be closed, it is cut at the last piece that leaves Markdown
+    entities balanced, falling back to the plain greedy cut if there is none.
+    """
+    chunks, current = [], []
+    for piece in pieces:
+        while current and _length(separator.join(current + [piece])) > limit:
+            cut = len(current)
+            if balance:
+                while cut > 0 and not _is_balanced(separator.join(current[:cut])):
+                    cut -= 1
+                cut = cut or len(current)
+            chunks.append(separator.join(current[:cut]))
+            current = current[cut:]
+        current.append(piece)
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+
+def _is_balanced(text: str) -> bool:
+    """Check that a chunk opens and closes its Markdown entities."""
+    if text.count(_FENCE) % 2:
+        return False
+    outside_code = _INLINE_CODE_PATTERN.sub("", "".join(text.split(_FENCE)[::2]))
+    if outside_code.count("`") % 2:
+        return False
+    outside_code = outside_code.replace("\\*", "").replace("\\_", "")
+    return outside_code.count("*") % 2 == 0 and outside_code.count("_") % 2 == 0
+
+
+def _seconds(value) -> float:
+    """Convert a RetryAfter delay (int or timedelta depending on PTB settings) to seconds."""
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+
+class TelegramOutbox:
+    """
+    Queued, rate-limited delivery of messages to Telegram chats.
+
+    Each chat gets its own queue and worker, so messages to a chat keep their order
+    while different chats are served concurrently. All workers share a global send
+    interval, and `RetryAfter` responses pause the affected chat before retrying.
+    """
+
+    def __init__(self, bot: Bot, max_attempts: int = 5, idle_timeout: float = 60.0):
+        """
+        Initialize the outbox.
+
+        Args:
+            bot: The bot used to send messages
+            max_attempts: Delivery attempts per chunk before giving up
+            idle_timeout: Seconds after which an idle chat worker exits
+        """
+        self.bot = bot
+        self.max_attempts = max_attempts
+        self.idle_timeout = idle_timeout
+        self._queues: Dict[int, asyncio.Queue] = {}
+        self._workers: Dict[int, asyncio.Task] = {}
+        self._next_chat_slot: Dict[int, float] = {}
+        self._next_global_slot = 0.0
+        self._global_lock = asyncio.Lock()
+
+    async def send(self, chat_id: int, text: str, parse_mode: Optional[str] = "Markdown") -> None:
+        """
+        Queue a message for a chat and wait until all of its chunks are delivered.
+
+        Args:
+            chat_id: Target chat
+            text: Message text, split automatically if too long
+            parse_mode: Telegram parse mode, or None for plain text
+
+        Raises:
+            telegram.error.TelegramError: If a chunk could not be delivered
+        """
+        delivered = asyncio.get_running_loop().create_future()
+        if chat_id not in self._queues:
+            self._queues[chat_id] = asyncio.Queue()
+            self._workers[chat_id] = asyncio.create_task(self._worker(chat_id))
+        await self._queues[chat_id].put((split_message(text), parse_mode, delivered))
+        await delivered
+
+    async def _worker(self, chat_id: int) -> None:
+        """Deliver queued messages for one chat in order until the queue stays idle."""
+        queue = self._queues[chat_id]
+        while True:
+            try:
+                chunks, parse_mode, delivered = await asyncio.wait_for(queue.get(), self.idle_timeout)
+            except asyncio.TimeoutError:
+                if queue.empty():
+                    del self._queues[chat_id]
+                    del self._workers[chat_id]
+                    self._next_chat_slot.pop(chat_id, None)
+                    return
+                continue
+
+            try:
+                for chunk in chunks:
+                    await self._deliver(chat_id, chunk, parse_mode)
+                delivered.set_result(None)
+            except Exception as e:
+                if not delivered.done():
+                    delivered.set_exception(e)
+
+    async def _deliver(self, chat_id: int, text: str, parse_mode: Optional[str]) -> None:
+        """Send one chunk, honouring flood limits and falling back to plain text on parse errors."""
+        for attempt in range(self.max_attempts):
+            await self._wait_for_slot(chat_id)
+            try:
+                await self.bot.send_message(chat_id=chat_id, text=text, parse_mode=parse_mode)
+                return
+            except RetryAfter as e:
+                pause = _seconds(e.retry_after)
+                logger.warning(f"Flood control for chat {chat_id}, pausing {pause:.0f}s")
+                self._next_chat_slot[chat_id] = time.monotonic() + pause
+            except BadRequest as e:
+                if parse_mode is None or "parse entities" not in str(e).lower():
+                    raise
+                logger.warning(f"Markdown rejected for chat {chat_id}, resending as plain text: {e}")
+                parse_mode = None
+            except NetworkError as e:
+                if attempt == self.max_attempts - 1:
+                    raise
+                logger.warning(f"Network error sending to chat {chat_id}, retrying: {e}")
+                await asyncio.sleep(2 ** attempt)
+        raise NetworkError(f"Giving up on delivery to chat {chat_id} after {self.max_attempts} attempts")
+
+    async def _wait_for_slot(self, chat_id: int) -> None:
+        """Sleep until both the chat's and the global send interval allow another message."""
+        chat_interval = GROUP_CHAT_SEND_INTERVAL if chat_id < 0 else PRIVATE_CHAT_SEND_INTERVAL
+        chat_delay = self._next_chat_slot.get(chat_id, 0.0) - time.monotonic()
+        if chat_delay > 0:
+            await asyncio.sleep(chat_delay)
+
+        async with self._global_lock:
+            now = time.monotonic()
+            if self._next_global_slot > now:
+                await asyncio.sleep(self._next_global_slot - now)
+                now = time.monotonic()
+            self._next_global_slot = now + GLOBAL_SEND_INTERVAL
+
+        self._next_chat_slot[chat_id] = time.monotonic() + chat_interval
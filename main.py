@@ -40,18 +40,36 @@ def show_interface_menu() -> str:
             sys.exit(0)
 
 
-def start_cli_interface():
+def build_profiler(args):
+    """Build the run profiler requested on the command line, if any."""
+    if not args.profile:
+        return None
+    from src.agents.custom.profiling import RunProfiler
+    return RunProfiler(output_dir=args.profile_dir, every_n=args.profile_every)
+
+
+def build_recorder(args):
+    """Build the traffic recorder requested on the command line, if any."""
+    if not args.record:
+        return None
+    from src.harness.cassette import TrafficRecorder
+    return TrafficRecorder(args.record)
+
+
+def start_cli_interface(profiler=None, recorder=None):
     """Start the CLI interface."""
     try:
         from interfaces.cli import CLIInterface
-        cli = CLIInterface()
+        cli = CLIInterface(profiler=profiler)
+        if recorder:
+            recorder.attach(cli.agent)
         cli.start()
     except Exception as e:
         print(f"❌ Failed to start CLI interface: {e}")
         sys.exit(1)
 
 
-def start_telegram_interface():
+def start_telegram_interface(profiler=None, recorder=None):
     """Start the Telegram bot interface."""
     # Check if Telegram bot token is available
     telegram_token = os.getenv('TELEGRAM_BOT_TOKEN')
@@ -65,13 +83,65 @@ def start_telegram_interface():
     
     try:
         from interfaces.telegram_bot import TelegramInterface
-        bot = TelegramInterface()
+        bot = TelegramInterface(profiler=profiler)
+        if recorder:
+            recorder.attach(bot.agent)
         bot.start()
     except Exception as e:
         print(f"❌ Failed to start Telegram bot: {e}")
         sys.exit(1)
 
 
+def run_export(args):
+    """Export the Backlog table to a CSV or JSON-lines file."""
+    try:
+        from src.services.backlog_transfer import export_records
+        count = export_records("Backlog", args.path, fmt=args.format, fields=args.fields)
+        print(f"✅ Exported {count} records to {args.path}")
+    except Exception as e:
+        print(f"❌ Export failed: {e}")
+        sys.exit(1)
+
+
+def run_import(args):
+    """Import a CSV or JSON-lines file into the Backlog table."""
+    try:
+        from src.services.backlog_transfer import import_records
+        count = import_records("Backlog", args.path, key_field=args.key, fmt=args.format)
+        print(f"✅ Imported {count} records from {args.path}")
+    except KeyboardInterrupt:
+        print("\n⏸️ Import interrupted, run the same command again to resume")
+        sys.exit(130)
+    except Exception as e:
+        print(f"❌ Import failed: {e}")
+        print("💡 Fix the problem and run the same command again to resume")
+        sys.exit(1)
+
+
+def run_replay(args):
+    """Replay recorded sessions concurrently and report latency and throughput."""
+    # Replays are fully offline, so credentials only need to be present, not valid
+    for name in ("OPENAI_API_KEY", "AIRTABLE_API_KEY", "AIRTABLE_BASE_ID", "AIRTABLE_BACKLOG_TABLE_ID"):
+        os.environ.setdefault(name, "replay")
+    try:
+        from src.harness.cassette import load_cassettes
+        from src.harness.replay import run_load
+        cassettes = load_cassettes(args.cassettes)
+        print(f"🎞️ Replaying {args.sessions} sessions from {len(cassettes)} cassette(s) at {args.rate}/s...")
+        report = run_load(
+            cassettes,
+            sessions=args.sessions,
+            arrival_rate=args.rate,
+            concurrency=args.concurrency,
+            latency_scale=args.latency_scale,
+            seed=args.seed,
+        )
+        print(report.format())
+    except Exception as e:
+        print(f"❌ Replay failed: {e}")
+        sys.exit(1)
+
+
 def main():
     """Main entry point for Agent Smith."""
     parser = argparse.ArgumentParser(
@@ -82,6 +152,16 @@ Examples:
   python main.py              # Interactive interface selection
   python main.py --cli         # Start CLI directly
   python main.py --telegram    # Start Telegram bot directly
+  python main.py --telegram --profile --profile-every 20
+                               # Profile every 20th agent run into ./profiles
+  python main.py export backlog.csv
+                               # Export the Backlog table (CSV or .jsonl)
+  python main.py import backlog.jsonl --key Name
+                               # Upsert tasks from a file, resumable
+  python main.py --cli --record cassettes/
+                               # Record sessions for offline load tests
+  python main.py replay cassettes/ --rate 5 --sessions 200
+                               # Replay them concurrently and report latency
   python main.py --help        # Show this help
 
 Environment Variables:
@@ -106,8 +186,77 @@ Environment Variables:
         help="Start Telegram bot interface directly"
     )
     
+    # Profiling arguments (can also be toggled at runtime with /profile)
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile agent runs with cProfile and tracemalloc and write a report per run"
+    )
+    parser.add_argument(
+        "--profile-dir",
+        default="profiles",
+        help="Directory for profiling reports (default: profiles)"
+    )
+    parser.add_argument(
+        "--profile-every",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Only profile every Nth agent run (default: 1)"
+    )
+    
+    # Traffic capture for offline load testing
+    parser.add_argument(
+        "--record",
+        metavar="DIR",
+        help="Record each agent session (OpenAI and Airtable traffic) as a cassette in DIR"
+    )
+    
+    # Bulk data and load testing commands
+    subparsers = parser.add_subparsers(dest="command", metavar="{import,export,replay}")
+    export_parser = subparsers.add_parser("export", help="Stream the Backlog table to a CSV or JSON-lines file")
+    export_parser.add_argument("path", help="File to write (.csv, .jsonl or .ndjson)")
+    export_parser.add_argument("--format", choices=["csv", "jsonl"], help="File format (default: from extension)")
+    export_parser.add_argument(
+        "--fields",
+        nargs="+",
+        metavar="FIELD",
+        help="CSV columns to export (default: Name, Notes, Status, Due date / time, Attachments)"
+    )
+    import_parser = subparsers.add_parser("import", help="Upsert tasks from a CSV or JSON-lines file")
+    import_parser.add_argument("path", help="File to read (.csv, .jsonl or .ndjson)")
+    import_parser.add_argument("--format", choices=["csv", "jsonl"], help="File format (default: from extension)")
+    import_parser.add_argument("--key", default="Name", help="Field matching rows to existing tasks (default: Name)")
+    
+    replay_parser = subparsers.add_parser("replay", help="Load test the agent loop by replaying recorded sessions")
+    replay_parser.add_argument("cassettes", help="Directory of cassettes recorded with --record")
+    replay_parser.add_argument("--sessions", type=int, default=100, help="Number of sessions to run (default: 100)")
+    replay_parser.add_argument("--rate", type=float, default=1.0, help="Mean session arrivals per second (default: 1)")
+    replay_parser.add_argument("--concurrency", type=int, default=8, help="Maximum sessions in flight (default: 8)")
+    replay_parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=1.0,
+        help="Multiplier for recorded OpenAI and Airtable latencies, 0 for none (default: 1)"
+    )
+    replay_parser.add_argument("--seed", type=int, help="Random seed for repeatable arrivals")
+    
     # Parse arguments
     args = parser.parse_args()
+    if args.profile_every < 1:
+        parser.error("--profile-every must be at least 1")
+    profiler = build_profiler(args)
+    
+    if args.command == "export":
+        run_export(args)
+        return
+    if args.command == "import":
+        run_import(args)
+        return
+    if args.command == "replay":
+        run_replay(args)
+        return
+    recorder = build_recorder(args)
     
     # Determine which interface to start
     if args.cli:
@@ -122,9 +271,9 @@ Environment Variables:
     print(f"\n🚀 Starting {interface.upper()} interface...\n")
     
     if interface == "cli":
-        start_cli_interface()
+        start_cli_interface(profiler, recorder)
     elif interface == "telegram":
-        start_telegram_interface()
+        start_telegram_interface(profiler, recorder)
     else:
         print(f"❌ Unknown interface: {interface}")
         sys.exit(1)
@@ -1,6 +1,11 @@
+import contextvars
 import json
 import logging
-from typing import Optional, Dict, List
+import time
+import tracemalloc
+from contextlib import nullcontext
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Optional, Dict, List, Tuple
 
 from openai import OpenAI
 from openai.types.chat import (
@@ -14,7 +19,10 @@ from openai.types.chat import (
     ChatCompletionToolMessageParam
 )
 
+from .profiling import RunProfile, RunProfiler
+from .resilience import ResiliencePolicy, ResilientCaller
 from .tools.tool import Tool
+from .tools.argument_validation import ArgumentValidator, ToolArgumentError
 from .tools.airtable_create_record_tool import AirtableCreateRecordTool
 from .tools.airtable_get_all_records_tool import AirtableGetAllRecordsTool
 from .tools.airtable_delete_record_tool import AirtableDeleteRecordTool
@@ -30,6 +38,12 @@ class AgentError(Exception):
     pass
 
 
+# How a prefetched tool result is handed to the model
+PREFETCH_MODE_ANSWER = "answer"    # Answer the model's first matching tool call from the prefetch
+PREFETCH_MODE_CONTEXT = "context"  # Inject a snapshot into the initial context up front
+PREFETCH_MODES = (PREFETCH_MODE_ANSWER, PREFETCH_MODE_CONTEXT)
+
+
 class Agent:
     """
     An AI agent that can execute tool calls using OpenAI's chat completion API.
@@ -45,6 +59,10 @@ class Agent:
         system_message: str = "Use tool calls to solve the user's request.",
         max_steps: int = 10,
         api_key: Optional[str] = None,
+        prefetch_tool: Optional[str] = None,
+        prefetch_mode: str = PREFETCH_MODE_ANSWER,
+        resilience: Optional[ResiliencePolicy] = None,
+        profiler: Optional[RunProfiler] = None,
     ) -> None:
         """
         Initialize the Agent.
@@ -55,14 +73,44 @@ class Agent:
             system_message: System prompt to guide the agent's behavior
             max_steps: Maximum number of conversation steps before stopping
             api_key: OpenAI API key (if not provided, uses environment variable)
+            prefetch_tool: Name of an argument-less tool to run speculatively at the
+                start of every run, concurrently with the first model call
+            prefetch_mode: 'answer' to serve the model's first call of the prefetched
+                tool from the speculative result, or 'context' to inject a snapshot
+                of it into the initial messages instead
+            resilience: Deadlines, retries and hedging for model calls (defaults to
+                ResiliencePolicy())
+            profiler: Samples runs with cProfile and tracemalloc when set
         """
         self.model = model
         self.system_message = system_message
         self.tools: Dict[str, Tool] = {tool.name: tool for tool in tools} if tools else {}
         self.max_steps = max_steps
+        self.profiler = profiler
         
+        # Compile argument validators once, so invalid calls are rejected before a tool runs
         try:
-            self.client = OpenAI(api_key=api_key)
+            self._validators: Dict[str, ArgumentValidator] = {
+                name: ArgumentValidator(name, tool.function_definition["function"].get("parameters", {}))
+                for name, tool in self.tools.items()
+            }
+        except Exception as e:
+            raise AgentError(f"Invalid tool parameter schema: {e}")
+
+        if prefetch_tool is not None and prefetch_tool not in self.tools:
+            raise AgentError(f"Prefetch tool '{prefetch_tool}' is not registered")
+        if prefetch_mode not in PREFETCH_MODES:
+            raise AgentError(f"Unknown prefetch mode '{prefetch_mode}'. Expected one of {PREFETCH_MODES}")
+        self.prefetch_tool = prefetch_tool
+        self.prefetch_mode = prefetch_mode
+        # Runs can overlap (e.g. one per Telegram chat), so allow a few prefetches at once
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="agent-prefetch") if prefetch_tool else None
+        
+        self.resilience = ResilientCaller(resilience or ResiliencePolicy())
+        
+        try:
+            # Retries are handled by the resilience layer so they respect the run deadline
+            self.client = OpenAI(api_key=api_key, max_retries=0)
         except Exception as e:
             raise AgentError(f"Failed to initialize OpenAI client: {e}")
         
@@ -89,31 +137,132 @@ class Agent:
             
         logger.info(f"Starting agent run with prompt: {initial_prompt[:100]}...")
         
+        if self.profiler is None:
+            return self._run(initial_prompt, None)
+        with self.profiler.profile_run(initial_prompt) as profile:
+            return self._run(initial_prompt, profile)
+
+    def _run(self, initial_prompt: str, profile: Optional[RunProfile]) -> Optional[str]:
+        """Run the conversation loop, recording tool executions on the profile if given."""
+        deadline = self.resilience.deadline()
+        prefetch = self._start_prefetch()
         messages = self._initialize_messages(initial_prompt)
+        try:
+            if prefetch is not None and self.prefetch_mode == PREFETCH_MODE_CONTEXT:
+                snapshot = self._prefetch_result(prefetch, deadline, profile, snapshot=True)
+                prefetch = None
+                if snapshot is not None:
+                    messages.insert(1, self._create_snapshot_message(snapshot))
         
-        for step in range(self.max_steps):
-            logger.debug(f"Agent step {step + 1}/{self.max_steps}")
+            for step in range(self.max_steps):
+                logger.debug(f"Agent step {step + 1}/{self.max_steps}")
             
-            try:
-                response = self._call_openai(messages)
-                assistant_message = response.choices[0].message
-                messages.append(self._convert_message_to_param(assistant_message))
-
-                if tool_calls := assistant_message.tool_calls:
-                    logger.info(f"Executing {len(tool_calls)} tool call(s)")
-                    for tool_call in tool_calls:
-                        tool_response = self._execute_tool_call(tool_call)
-                        messages.append(tool_response)
-                else:
-                    logger.info("Agent completed successfully")
-                    return assistant_message.content
+                try:
+                    response = self._call_openai(messages, deadline)
+                    assistant_message = response.choices[0].message
+                    messages.append(self._convert_message_to_param(assistant_message))
+
+                    if tool_calls := assistant_message.tool_calls:
+                        logger.info(f"Executing {len(tool_calls)} tool call(s)")
+                        for tool_call in tool_calls:
+                            if prefetch is not None and self._is_prefetched_call(tool_call):
+                                result = self._prefetch_result(prefetch, deadline, profile)
+                                prefetch = None
+                                if result is not None:
+                                    logger.info(f"Answering '{tool_call.function.name}' from prefetched result")
+                                    messages.append(self._create_tool_response(tool_call.id, result))
+                                    continue
+                            # Any other tool may change the data, so the prefetch is stale from here on
+                            prefetch = None
+                            with profile.tool(tool_call.function.name) if profile else nullcontext():
+                                tool_response = self._execute_tool_call(tool_call)
+                            messages.append(tool_response)
+                    else:
+                        logger.info("Agent completed successfully")
+                        return assistant_message.content
                     
-            except Exception as e:
-                logger.error(f"Error in agent step {step + 1}: {e}")
-                raise AgentError(f"Agent execution failed at step {step + 1}: {e}")
+                except Exception as e:
+                    logger.error(f"Error in agent step {step + 1}: {e}")
+                    raise AgentError(f"Agent execution failed at step {step + 1}: {e}")
         
-        logger.warning(f"Agent reached maximum steps ({self.max_steps}) without completion")
-        return None
+            logger.warning(f"Agent reached maximum steps ({self.max_steps}) without completion")
+            return None
+        finally:
+            if profile is not None:
+                profile.record_messages(messages)
+
+    def _start_prefetch(self) -> Optional[Future]:
+        """Start the speculative prefetch tool call in the background, if configured."""
+        if self._prefetch_executor is None:
+            return None
+
+        tool = self.tools[self.prefetch_tool]
+        call = tool.snapshot if self.prefetch_mode == PREFETCH_MODE_CONTEXT else tool
+        # Run in the caller's context so context variables (e.g. rate limit priority) carry over
+        return self._prefetch_executor.submit(contextvars.copy_context().run, self._measure_prefetch, call)
+
+    @staticmethod
+    def _measure_prefetch(call) -> Tuple[Any, int]:
+        """Run the prefetch and return its result with the net memory traced meanwhile (0 when not tracing)."""
+        # Tracing is process-wide, so this includes whatever the run allocated concurrently
+        memory_before = tracemalloc.get_traced_memory()[0]
+        result = call()
+        return result, tracemalloc.get_traced_memory()[0] - memory_before
+
+    def _prefetch_result(
+        self,
+        prefetch: Future,
+        deadline: float,
+        profile: Optional[RunProfile] = None,
+        snapshot: bool = False,
+    ) -> Optional[str]:
+        """
+        Wait for a prefetch to finish, at most until the run deadline, and return its result.
+        
+        Args:
+            prefetch: The future returned by _start_prefetch
+            deadline: Run deadline from ResilientCaller.deadline()
+            profile: Profile to record the prefetch on as a tool execution, if the run is sampled
+            snapshot: Whether the prefetch produced a context snapshot (for logging only)
+            
+        Returns:
+            The prefetched tool output, or None if the prefetch failed or didn't finish in time
+        """
+        kind = "snapshot" if snapshot else "result"
+        started = time.perf_counter()
+        try:
+            result, allocated = prefetch.result(timeout=self.resilience.remaining(deadline))
+            # The fetch itself ran outside cProfile, so record the time the run waited for it
+            if profile is not None:
+                profile.record_tool(f"{self.prefetch_tool} (prefetched)", time.perf_counter() - started, allocated)
+            return str(result)
+        except FutureTimeoutError:
+            logger.warning(f"Prefetch of '{self.prefetch_tool}' didn't finish before the run deadline, ignoring the {kind}")
+            return None
+        except Exception as e:
+            logger.warning(f"Prefetch of '{self.prefetch_tool}' failed, ignoring the {kind}: {e}")
+            return None
+
+    def _is_prefetched_call(self, tool_call: ChatCompletionMessageToolCall) -> bool:
+        """Check whether a tool call can be answered by the prefetched result."""
+        if tool_call.function.name != self.prefetch_tool:
+            return False
+        try:
+            args = json.loads(tool_call.function.arguments or "{}")
+        except json.JSONDecodeError:
+            return False
+        # The prefetch ran without arguments, so only an argument-less call matches it
+        return not args
+
+    def _create_snapshot_message(self, snapshot: str) -> ChatCompletionSystemMessageParam:
+        """Create the system message carrying a prefetched snapshot."""
+        return ChatCompletionSystemMessageParam(
+            role="system",
+            content=(
+                f"Snapshot of `{self.prefetch_tool}` taken at the start of this request "
+                f"(call the tool again only if you need data changed since):\n{snapshot}"
+            ),
+        )
 
     def _initialize_messages(self, initial_prompt: str) -> List[ChatCompletionMessageParam]:
         """Initialize the conversation with system and user messages."""
@@ -156,12 +305,22 @@ class Agent:
             ] if message.tool_calls else None
         )
 
-    def _call_openai(self, messages: List[ChatCompletionMessageParam]) -> ChatCompletion:
+    def complete(
+        self, 
+        messages: List[ChatCompletionMessageParam], 
+        deadline: Optional[float] = None,
+        **options
+    ) -> ChatCompletion:
         """
-        Call the OpenAI API with the given messages.
+        Make a single chat completion call with the agent's model.
+        
+        Transient failures are retried with jittered backoff, and slow requests may be
+        hedged, according to the agent's resilience policy.
         
         Args:
             messages: List of messages to send to the API
+            deadline: Run deadline from ResilientCaller.deadline() (defaults to a fresh one)
+            **options: Extra arguments for the API, e.g. tools or response_format
             
         Returns:
             The API response
@@ -170,12 +329,14 @@ class Agent:
             AgentError: If the API call fails
         """
         try:
-            tools = [tool.function_definition for tool in self.tools.values()] if self.tools else None
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                tools=tools,
+            response = self.resilience.call(
+                lambda timeout: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    timeout=timeout,
+                    **options,
+                ),
+                deadline,
             )
             
             logger.debug(f"OpenAI API call successful, tokens used: {response.usage.total_tokens if response.usage else 'unknown'}")
@@ -185,6 +346,15 @@ class Agent:
             logger.error(f"OpenAI API call failed: {e}")
             raise AgentError(f"Failed to get response from OpenAI: {e}")
 
+    def _call_openai(
+        self, 
+        messages: List[ChatCompletionMessageParam], 
+        deadline: Optional[float] = None
+    ) -> ChatCompletion:
+        """Call the OpenAI API with the given messages and the agent's tools."""
+        tools = [tool.function_definition for tool in self.tools.values()] if self.tools else None
+        return self.complete(messages, deadline, tools=tools)
+
     def _execute_tool_call(
         self, 
         tool_call: ChatCompletionMessageToolCall
@@ -208,6 +378,7 @@ class Agent:
                 return self._create_tool_response(tool_call.id, error_msg)
 
             args = json.loads(tool_call.function.arguments)
+            args = self._validators[tool_name].validate(args)
             logger.debug(f"Tool arguments: {args}")
 
             tool_response = self.tools[tool_name](**args)
@@ -220,6 +391,11 @@ class Agent:
             logger.error(error_msg)
             return self._create_tool_response(tool_call.id, error_msg)
             
+        except ToolArgumentError as e:
+            error_msg = f"{e}. The tool was not executed, fix the arguments and call it again."
+            logger.error(error_msg)
+            return self._create_tool_response(tool_call.id, error_msg)
+            
         except Exception as e:
             error_msg = f"Tool execution failed: {e}"
             logger.error(error_msg)
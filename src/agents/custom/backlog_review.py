@@ -0,0 +1,267 @@
+import json
+import logging
+import threading
+from collections import Counter
+from contextvars import copy_context
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from openai.types.chat import ChatCompletionSystemMessageParam, ChatCompletionUserMessageParam
+
+from .agent import Agent, AgentError
+from .tools.airtable_get_all_records_tool import RECORD_LINE_FORMAT, format_record_line
+import src.services.airtable_service as airtable_service
+from src.services.search_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Caps on what is passed to the final summary call, so it stays small at any backlog size
+_MAX_OVERDUE_IN_SUMMARY = 50
+_MAX_CANDIDATES_IN_SUMMARY = 100
+
+_MAP_INSTRUCTIONS = f"""You are reviewing one chunk of a larger task backlog.
+Each line is a record formatted as `{RECORD_LINE_FORMAT}`.
+
+Find records that need cleanup: completed tasks that can be removed, near-duplicates within this
+chunk, and tasks with missing or unclear information. Tasks with identical names are matched across
+the whole backlog separately, so you don't need to flag those.
+
+Respond with a JSON object:
+{{"cleanup_candidates": [{{"record_id": "rec...", "action": "delete" | "update" | "merge", "reason": "short reason"}}],
+  "themes": ["a few words on a recurring topic in this chunk"]}}"""
+
+
+@dataclass
+class ChunkReview:
+    """Partial review of one chunk of records."""
+    total: int = 0
+    status_counts: Counter = field(default_factory=Counter)
+    overdue: List[str] = field(default_factory=list)
+    cleanup_candidates: List[Dict] = field(default_factory=list)
+    themes: List[str] = field(default_factory=list)
+    # Record IDs by normalized name, so duplicates can be matched across chunks
+    names: Dict[str, List[str]] = field(default_factory=dict)
+
+    def merge(self, other: "ChunkReview") -> None:
+        self.total += other.total
+        self.status_counts.update(other.status_counts)
+        self.overdue.extend(other.overdue)
+        self.cleanup_candidates.extend(other.cleanup_candidates)
+        self.themes.extend(other.themes)
+        for name, record_ids in other.names.items():
+            self.names.setdefault(name, []).extend(record_ids)
+
+    def add_duplicate_candidates(self) -> None:
+        """Flag every record sharing its normalized name with an earlier one, wherever it sits in the table."""
+        flagged = {candidate["record_id"] for candidate in self.cleanup_candidates}
+        for record_ids in self.names.values():
+            original, *duplicates = record_ids
+            for record_id in duplicates:
+                if record_id not in flagged:
+                    self.cleanup_candidates.append(
+                        {"record_id": record_id, "action": "merge", "reason": f"Same name as {original}"}
+                    )
+
+    def findings(self) -> Dict:
+        """Summarize the review for a model, with lists capped so it stays small at any backlog size."""
+        return {
+            "total_records": self.total,
+            "status_counts": dict(self.status_counts),
+            "overdue_count": len(self.overdue),
+            "overdue": self.overdue[:_MAX_OVERDUE_IN_SUMMARY],
+            "cleanup_candidate_count": len(self.cleanup_candidates),
+            "cleanup_candidates": self.cleanup_candidates[:_MAX_CANDIDATES_IN_SUMMARY],
+            "themes": sorted(set(self.themes)),
+        }
+
+
+@dataclass
+class BacklogReview:
+    """Merged result of a chunked backlog review."""
+    summary: str
+    total: int
+    status_counts: Dict[str, int]
+    overdue: List[str]
+    cleanup_candidates: List[Dict]
+
+
+class BacklogReviewer:
+    """
+    Map-reduce review of a backlog too large for a single model context.
+
+    Records are streamed page by page and grouped into chunks. Counts and overdue items
+    are computed locally, each chunk is sent to the model for cleanup candidates in
+    parallel, and the merged findings are turned into one summary by a final call.
+    Exact duplicate names are matched locally across all chunks before the summary.
+    Only a bounded number of chunks is held in memory at any time.
+    """
+
+    def __init__(
+        self,
+        agent: Agent,
+        table_name: str = "Backlog",
+        chunk_size: int = 200,
+        max_concurrency: int = 4,
+    ) -> None:
+        """
+        Initialize the reviewer.
+
+        Args:
+            agent: Agent whose model, system message and resilience policy are used
+            table_name: Airtable table to review
+            chunk_size: Records per model call in the map step
+            max_concurrency: Maximum chunks reviewed by the model at once
+        """
+        self.agent = agent
+        self.table_name = table_name
+        self.chunk_size = chunk_size
+        self.max_concurrency = max_concurrency
+
+    def review(self, instructions: str) -> BacklogReview:
+        """
+        Review the whole table and summarize it.
+
+        Args:
+            instructions: What the final summary should contain
+
+        Returns:
+            The merged review, including the model's summary
+
+        Raises:
+            AgentError: If a model call fails
+        """
+        merged = self.collect()
+        return BacklogReview(
+            summary=self._summarize(merged, instructions),
+            total=merged.total,
+            status_counts=dict(merged.status_counts),
+            overdue=merged.overdue,
+            cleanup_candidates=merged.cleanup_candidates,
+        )
+
+    def collect(self) -> ChunkReview:
+        """
+        Run the map step over the whole table and merge the chunk reviews.
+
+        Stops reading the table and cancels the chunks not yet started as soon as
+        one chunk fails.
+
+        Returns:
+            The merged review, without a summary
+
+        Raises:
+            AgentError: If a model call fails
+        """
+        now = datetime.now(timezone.utc)
+        merged = ChunkReview()
+        slots = threading.BoundedSemaphore(self.max_concurrency)
+        futures: List[Future] = []
+        failed = threading.Event()
+
+        def chunk_done(future: Future) -> None:
+            if not future.cancelled() and future.exception() is not None:
+                failed.set()
+            slots.release()
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="backlog-review") as executor:
+            for chunk in self._chunks(airtable_service.iterate_records(self.table_name)):
+                # Block the producer while all workers are busy, so pages aren't read ahead unboundedly
+                slots.acquire()
+                if failed.is_set():
+                    break
+                # Run in the caller's context so context variables (e.g. rate limit priority) carry over
+                future = executor.submit(copy_context().run, self._review_chunk, chunk, now)
+                future.add_done_callback(chunk_done)
+                futures.append(future)
+
+            wait(futures, return_when=FIRST_EXCEPTION)
+            if failed.is_set():
+                for future in futures:
+                    future.cancel()
+            # Merge in submission order, raising the first chunk's error if any failed
+            for future in futures:
+                if not future.cancelled():
+                    if future.exception() is not None:
+                        raise future.exception()
+                    merged.merge(future.result())
+
+        # The model only sees one chunk at a time, so exact duplicates are matched here
+        merged.add_duplicate_candidates()
+        logger.info(f"Reviewed {merged.total} records in {len(futures)} chunk(s)")
+        return merged
+
+    def _chunks(self, pages: Iterable[List[Dict]]) -> Iterator[List[Dict]]:
+        """Regroup pages of records into chunks of chunk_size."""
+        chunk: List[Dict] = []
+        for page in pages:
+            for record in page:
+                chunk.append(record)
+                if len(chunk) == self.chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    def _review_chunk(self, records: List[Dict], now: datetime) -> ChunkReview:
+        """Map step: local statistics plus the model's cleanup candidates for one chunk."""
+        result = ChunkReview(total=len(records))
+        for record in records:
+            fields = record.get("fields", {})
+            status = fields.get("Status") or "No status"
+            result.status_counts[status] += 1
+            if status != "Done" and _is_overdue(fields.get("Due date / time"), now):
+                result.overdue.append(format_record_line(record))
+            if name := " ".join(tokenize(str(fields.get("Name", "")))):
+                result.names.setdefault(name, []).append(record["id"])
+
+        response = self.agent.complete(
+            [
+                ChatCompletionSystemMessageParam(role="system", content=_MAP_INSTRUCTIONS),
+                ChatCompletionUserMessageParam(
+                    role="user", content="\n".join(format_record_line(record) for record in records)
+                ),
+            ],
+            response_format={"type": "json_object"},
+        )
+        try:
+            findings = json.loads(response.choices[0].message.content or "{}")
+        except json.JSONDecodeError as e:
+            raise AgentError(f"Backlog review returned invalid JSON: {e}")
+
+        known_ids = {record["id"] for record in records}
+        result.cleanup_candidates = [
+            candidate for candidate in findings.get("cleanup_candidates", [])
+            if isinstance(candidate, dict) and candidate.get("record_id") in known_ids
+        ]
+        result.themes = [str(theme) for theme in findings.get("themes", [])]
+        return result
+
+    def _summarize(self, merged: ChunkReview, instructions: str) -> Optional[str]:
+        """Reduce step: turn the merged findings into the final summary."""
+        findings = merged.findings()
+        response = self.agent.complete([
+            ChatCompletionSystemMessageParam(role="system", content=self.agent.system_message),
+            ChatCompletionUserMessageParam(
+                role="user",
+                content=(
+                    f"{instructions}\n\nThe backlog was reviewed in chunks. Merged findings "
+                    f"(lists may be truncated, counts are complete):\n{json.dumps(findings, ensure_ascii=False)}"
+                ),
+            ),
+        ])
+        return response.choices[0].message.content
+
+
+def _is_overdue(due: Optional[str], now: datetime) -> bool:
+    """Check whether an ISO 8601 due date lies in the past."""
+    if not due:
+        return False
+    try:
+        parsed = datetime.fromisoformat(due)
+    except ValueError:
+        return False
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed < now
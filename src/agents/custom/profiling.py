@@ -0,0 +1,182 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RunProfile:
+    """Measurements collected during one profiled agent run."""
+
+    def __init__(self, run_number: int, prompt: str):
+        self.run_number = run_number
+        self.prompt = prompt
+        self.tool_timings: List[Tuple[str, float, int]] = []
+        self.message_count = 0
+        self.message_chars = 0
+
+    @contextmanager
+    def tool(self, name: str) -> Iterator[None]:
+        """Time a tool execution and the net memory it allocated."""
+        memory_before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_tool(name, time.perf_counter() - started, tracemalloc.get_traced_memory()[0] - memory_before)
+
+    def record_tool(self, name: str, seconds: float, allocated: int) -> None:
+        """Record a tool execution measured elsewhere, e.g. on a background thread."""
+        self.tool_timings.append((name, seconds, allocated))
+
+    def record_messages(self, messages: List) -> None:
+        """Record the size of the run's message list."""
+        self.message_count = len(messages)
+        self.message_chars = sum(len(str(message.get("content") or "")) for message in messages)
+
+
+class RunProfiler:
+    """
+    Samples agent runs with cProfile and tracemalloc and writes a report per run.
+
+    Only every Nth run is profiled, and nothing is traced between sampled runs, so the
+    profiler can stay configured in production and be switched on and off at runtime.
+    """
+
+    def __init__(
+        self,
+        output_dir: str = "profiles",
+        every_n: int = 1,
+        enabled: bool = True,
+        top_n: int = 25,
+        trace_frames: int = 10,
+    ) -> None:
+        """
+        Initialize the profiler.
+
+        Args:
+            output_dir: Directory the reports are written to
+            every_n: Profile one run out of every N
+            enabled: Whether sampling starts switched on
+            top_n: Number of functions and allocation sites listed per report
+            trace_frames: Stack depth recorded by tracemalloc per allocation
+        """
+        if every_n < 1:
+            raise ValueError("every_n must be at least 1")
+        self.output_dir = output_dir
+        self.every_n = every_n
+        self.enabled = enabled
+        self.top_n = top_n
+        self.trace_frames = trace_frames
+        self._run_count = 0
+        self._active = 0
+        self._owns_tracing = False
+        self._lock = threading.Lock()
+
+    def toggle(self) -> bool:
+        """Switch profiling on or off and return the new state."""
+        self.enabled = not self.enabled
+        logger.info(f"Profiling {'enabled' if self.enabled else 'disabled'}")
+        return self.enabled
+
+    @contextmanager
+    def profile_run(self, prompt: str) -> Iterator[Optional[RunProfile]]:
+        """
+        Profile the enclosed run if it is sampled.
+
+        Yields:
+            The RunProfile to record tool executions and messages on, or None if
+            this run is not sampled
+        """
+        with self._lock:
+            self._run_count += 1
+            run_number = self._run_count
+            if not self.enabled or run_number % self.every_n:
+                sampled = False
+            else:
+                sampled = True
+                self._active += 1
+                if self._active == 1:
+                    # Leave tracing alone if someone else (e.g. PYTHONTRACEMALLOC) started it
+                    self._owns_tracing = not tracemalloc.is_tracing()
+                    if self._owns_tracing:
+                        tracemalloc.start(self.trace_frames)
+                    tracemalloc.reset_peak()
+
+        if not sampled:
+            yield None
+            return
+
+        profile = RunProfile(run_number, prompt)
+        # cProfile can't nest with another profiler on this thread (e.g. an outer debugger)
+        profiler = cProfile.Profile() if sys.getprofile() is None else None
+        snapshot_before = tracemalloc.take_snapshot()
+        started = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield profile
+        finally:
+            if profiler:
+                profiler.disable()
+            elapsed = time.perf_counter() - started
+            snapshot_after = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            with self._lock:
+                self._active -= 1
+                if self._active == 0 and self._owns_tracing:
+                    tracemalloc.stop()
+            try:
+                self._write_report(profile, profiler, snapshot_before, snapshot_after, elapsed, peak)
+            except OSError as e:
+                logger.error(f"Failed to write profile report: {e}")
+
+    def _write_report(
+        self,
+        profile: RunProfile,
+        profiler: Optional[cProfile.Profile],
+        snapshot_before: tracemalloc.Snapshot,
+        snapshot_after: tracemalloc.Snapshot,
+        elapsed: float,
+        peak: int,
+    ) -> None:
+        """Write the text report, plus raw cProfile stats for tools like snakeviz."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{profile.run_number}"
+        path = os.path.join(self.output_dir, f"{name}.txt")
+
+        out = io.StringIO()
+        out.write(f"Run #{profile.run_number}: {profile.prompt[:100]!r}\n")
+        out.write(f"Wall time: {elapsed:.3f}s\n")
+        out.write(f"Peak traced memory: {peak / 1024:.1f} KiB\n")
+        out.write(f"Messages: {profile.message_count} ({profile.message_chars} characters of content)\n")
+
+        out.write("\n== Tool executions ==\n")
+        for tool_name, seconds, allocated in profile.tool_timings:
+            out.write(f"{tool_name}: {seconds:.3f}s, {allocated / 1024:+.1f} KiB\n")
+
+        out.write(f"\n== Top {self.top_n} allocation sites (net growth during the run) ==\n")
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        growth = snapshot_after.filter_traces(filters).compare_to(snapshot_before.filter_traces(filters), "lineno")
+        for stat in growth[:self.top_n]:
+            out.write(f"{stat}\n")
+
+        out.write(f"\n== Top {self.top_n} functions by cumulative time ==\n")
+        if profiler:
+            pstats.Stats(profiler, stream=out).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_n)
+            profiler.dump_stats(os.path.join(self.output_dir, f"{name}.prof"))
+        else:
+            out.write("Skipped: another profiler was active on this thread\n")
+
+        with open(path, "w") as f:
+            f.write(out.getvalue())
+        logger.info(f"Profile report written to {path}")
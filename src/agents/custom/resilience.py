@@ -0,0 +1,240 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextvars import copy_context
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+from typing import Callable, Optional, TypeVar
+
+import openai
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits and server errors
+_RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when a call cannot complete within its deadline."""
+    pass
+
+
+@dataclass
+class ResiliencePolicy:
+    """
+    Settings for deadlines, retries and hedging of model calls.
+
+    Attributes:
+        step_timeout: Maximum seconds for a single model request
+        step_deadline: Maximum seconds for one model call, including its retries and backoff
+        run_timeout: Maximum seconds for all model requests of one agent run
+        max_retries: Retries after the first attempt on retryable errors
+        backoff_base: Base delay in seconds for exponential backoff
+        backoff_max: Upper bound in seconds for a single backoff delay
+        hedge: Whether to send a duplicate request when the first one is slow
+        hedge_percentile: Latency percentile after which a duplicate is sent
+        hedge_min_delay: Never hedge earlier than this many seconds
+        hedge_min_samples: Latency samples needed before hedging kicks in
+        hedge_budget: Maximum fraction of requests that may be duplicated
+        latency_window: Number of recent latencies used to estimate percentiles
+    """
+    step_timeout: float = 60.0
+    step_deadline: float = 90.0
+    run_timeout: float = 180.0
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    hedge: bool = False
+    hedge_percentile: float = 0.95
+    hedge_min_delay: float = 1.0
+    hedge_min_samples: int = 20
+    hedge_budget: float = 0.1
+    latency_window: int = 200
+
+
+def is_retryable(error: Exception) -> bool:
+    """Check whether an OpenAI error is transient and worth retrying."""
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in _RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Read a Retry-After hint (in seconds) from an OpenAI error, if present."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class LatencyTracker:
+    """Thread-safe rolling window of call latencies."""
+
+    def __init__(self, window: int):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Return the given percentile (0-1) of recent latencies, or None without samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(fraction * len(samples)))
+        return samples[index]
+
+
+class ResilientCaller:
+    """
+    Runs calls with deadlines, jittered exponential backoff and optional hedging.
+
+    Hedging sends a duplicate request when the first one hasn't returned by the
+    configured latency percentile and takes whichever finishes first. Each call earns
+    `hedge_budget` of a hedge token, so duplicates never exceed that share of traffic.
+
+    Hedgeable requests run on threads of their own rather than a shared pool: the
+    losing request keeps running until it finishes, and a capped pool filled with
+    such stragglers would queue new requests and raise tail latency instead.
+    """
+
+    def __init__(
+        self,
+        policy: ResiliencePolicy,
+        sleep: Callable[[float], None] = time.sleep,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.policy = policy
+        self.latencies = LatencyTracker(policy.latency_window)
+        self._sleep = sleep
+        self._clock = clock
+        self._hedge_tokens = 1.0
+        self._hedge_lock = threading.Lock()
+
+    def deadline(self) -> float:
+        """Return the deadline for a run starting now."""
+        return self._clock() + self.policy.run_timeout
+
+    def remaining(self, deadline: float) -> float:
+        """Return the seconds left until a deadline from deadline(), or 0 if it has passed."""
+        return max(deadline - self._clock(), 0.0)
+
+    def call(self, fn: Callable[[float], T], deadline: Optional[float] = None) -> T:
+        """
+        Call `fn(timeout)` until it succeeds, fails permanently or the deadline passes.
+
+        Retries stop at the step deadline, step_deadline from now, or at the run
+        deadline if that comes first, so one step can't use up the whole run.
+
+        Args:
+            fn: The call to make, receiving the timeout in seconds for this attempt
+            deadline: Absolute run deadline on this caller's clock (defaults to one run_timeout from now)
+
+        Returns:
+            The result of the first successful attempt
+
+        Raises:
+            DeadlineExceededError: If the deadline passes before a successful attempt
+            Exception: The last error, if it is not retryable or retries are exhausted
+        """
+        if deadline is None:
+            deadline = self.deadline()
+        step_deadline = self._clock() + self.policy.step_deadline
+        kind = "Step" if step_deadline < deadline else "Run"
+        deadline = min(deadline, step_deadline)
+
+        for attempt in range(self.policy.max_retries + 1):
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                raise DeadlineExceededError(f"{kind} deadline exceeded before the model responded")
+
+            try:
+                return self._attempt(fn, min(self.policy.step_timeout, remaining))
+            except Exception as e:
+                if not is_retryable(e) or attempt == self.policy.max_retries:
+                    raise
+
+                delay = random.uniform(0, min(self.policy.backoff_max, self.policy.backoff_base * 2 ** attempt))
+                if (hint := _retry_after(e)) is not None:
+                    delay = max(delay, hint)
+                if self._clock() + delay >= deadline:
+                    raise DeadlineExceededError(f"{kind} deadline leaves no time to retry after: {e}") from e
+
+                logger.warning(f"Retryable error on attempt {attempt + 1}, retrying in {delay:.2f}s: {e}")
+                self._sleep(delay)
+
+    def _attempt(self, fn: Callable[[float], T], timeout: float) -> T:
+        """Make a single attempt, hedged if the policy and budget allow it."""
+        with self._hedge_lock:
+            self._hedge_tokens = min(1.0, self._hedge_tokens + self.policy.hedge_budget)
+
+        threshold = self._hedge_threshold()
+        if threshold is None or threshold >= timeout:
+            return self._timed(fn, timeout)
+
+        started = self._clock()
+        primary = self._spawn(fn, timeout, "primary")
+        done, _ = wait([primary], timeout=threshold)
+        if done or not self._take_hedge_token():
+            return primary.result()
+
+        logger.info(f"No response after {threshold:.2f}s, sending a hedged request")
+        hedged = self._spawn(fn, timeout - (self._clock() - started), "hedge")
+        pending = {primary, hedged}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    def _spawn(self, fn: Callable[[float], T], timeout: float, name: str) -> "Future[T]":
+        """Start a timed attempt on a new daemon thread, in the caller's context, and return its future."""
+        future: Future = Future()
+        context = copy_context()
+
+        def run():
+            try:
+                future.set_result(context.run(self._timed, fn, timeout))
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name=f"resilience-{name}", daemon=True).start()
+        return future
+
+    def _timed(self, fn: Callable[[float], T], timeout: float) -> T:
+        """Run fn and record its latency on success."""
+        started = self._clock()
+        result = fn(timeout)
+        self.latencies.record(self._clock() - started)
+        return result
+
+    def _hedge_threshold(self) -> Optional[float]:
+        """Return the delay after which to hedge, or None if hedging is off or not yet calibrated."""
+        if not self.policy.hedge or len(self.latencies) < self.policy.hedge_min_samples:
+            return None
+        return max(self.policy.hedge_min_delay, self.latencies.percentile(self.policy.hedge_percentile))
+
+    def _take_hedge_token(self) -> bool:
+        with self._hedge_lock:
+            if self._hedge_tokens >= 1.0:
+                self._hedge_tokens -= 1.0
+                return True
+            return False
@@ -22,6 +22,7 @@ class AirtableCreateRecordTool(Tool):
                         required_fields=["Name", "Notes"]
                     )
                 },
+                "additionalProperties": False,
                 "required": ["fields"],
             },
         )
@@ -1,6 +1,7 @@
 from openai.types.chat import ChatCompletionToolParam
 
 from .tool import Tool
+from .airtable_schemas import build_record_id_parameter
 
 import src.services.airtable_service as airtable_service
 
@@ -13,11 +14,9 @@ class AirtableDeleteRecordTool(Tool):
             "parameters": {
                 "type": "object",
                 "properties": {
-                    "record_id": {
-                        "type": "string",
-                        "description": "The ID of the record to delete"
-                    }
+                    "record_id": build_record_id_parameter("The ID of the record to delete")
                 },
+                "additionalProperties": False,
                 "required": ["record_id"]
             }
         }
@@ -4,12 +4,31 @@ from src.agents.custom.tools.tool import Tool
 
 import src.services.airtable_service as airtable_service
 
+RECORD_LINE_FORMAT = "id | Name | Status | Due date / time | Notes"
+
+# Larger backlogs don't fit the model's context, so only this many records are returned
+MAX_RECORDS_IN_RESULT = 200
+
+def format_record_line(record: dict, notes_length: int = 80) -> str:
+    """Render a record as one compact line in RECORD_LINE_FORMAT, truncating long notes."""
+    fields = record.get("fields", {})
+    notes = " ".join(str(fields.get("Notes", "")).split())
+    if len(notes) > notes_length:
+        notes = notes[:notes_length - 3] + "..."
+    return (
+        f"{record['id']} | {fields.get('Name', '')} | {fields.get('Status', '')} | "
+        f"{fields.get('Due date / time', '')} | {notes}"
+    )
+
 class AirtableGetAllRecordsTool(Tool):
     function_definition = ChatCompletionToolParam(
         type="function",
         function={
             "name": "airtable_get_all_records",
-            "description": "Get all records from an Airtable table",
+            "description": (
+                f"Get all records from the backlog (at most {MAX_RECORDS_IN_RESULT}; for larger backlogs "
+                "use review_backlog for cleanup and overviews, or search_tasks to find specific tasks)"
+            ),
             "parameters": {
                 "type": "object",
                 "properties": {
@@ -20,4 +39,29 @@ class AirtableGetAllRecordsTool(Tool):
     )
 
     def __call__(self, *args) -> str:
-        return str(airtable_service.get_all_records("Backlog"))
\ No newline at end of file
+        records = airtable_service.get_all_records("Backlog")
+        if len(records) <= MAX_RECORDS_IN_RESULT:
+            return str(records)
+        return self._truncated(records)
+
+    def snapshot(self) -> str:
+        records = airtable_service.get_all_records("Backlog")
+        if not records:
+            return "The backlog is empty."
+        if len(records) > MAX_RECORDS_IN_RESULT:
+            return self._truncated(records)
+
+        lines = [f"{len(records)} record(s) as `{RECORD_LINE_FORMAT}`:"]
+        lines.extend(format_record_line(record) for record in records)
+        return "\n".join(lines)
+
+    def _truncated(self, records: list) -> str:
+        """Render the first MAX_RECORDS_IN_RESULT records compactly, pointing at the tools for the rest."""
+        lines = [f"Showing {MAX_RECORDS_IN_RESULT} of {len(records)} record(s) as `{RECORD_LINE_FORMAT}`:"]
+        lines.extend(format_record_line(record) for record in records[:MAX_RECORDS_IN_RESULT])
+        lines.append(
+            "The backlog is too large to list in full. Use review_backlog for cleanup and counts, "
+            "or search_tasks to find specific tasks."
+        )
+        return "\n".join(lines)
+
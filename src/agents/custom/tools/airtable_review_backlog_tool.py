@@ -0,0 +1,38 @@
+import json
+from typing import TYPE_CHECKING, Optional
+
+from openai.types.chat import ChatCompletionToolParam
+
+from .tool import Tool
+
+if TYPE_CHECKING:
+    from ..backlog_review import BacklogReviewer
+
+class AirtableReviewBacklogTool(Tool):
+    function_definition = ChatCompletionToolParam(
+        type="function",
+        function={
+            "name": "review_backlog",
+            "description": (
+                "Review the whole backlog in chunks and return task counts by status, overdue tasks "
+                "and cleanup candidates (record ID, suggested action and reason). Works at any backlog "
+                "size; use it for cleanup and overview requests instead of fetching all records."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                },
+                "additionalProperties": False,
+                "required": []
+            }
+        }
+    )
+
+    def __init__(self, reviewer: Optional["BacklogReviewer"] = None):
+        # The reviewer needs the agent this tool is registered with, so it is usually set afterwards
+        self.reviewer = reviewer
+
+    def __call__(self, *args) -> str:
+        if self.reviewer is None:
+            raise RuntimeError("No backlog reviewer configured")
+        return json.dumps(self.reviewer.collect().findings(), ensure_ascii=False)
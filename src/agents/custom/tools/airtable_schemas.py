@@ -17,6 +17,7 @@ AIRTABLE_FIELDS_SCHEMA = {
     },
     "Due date / time": {
         "type": "string",
+        "format": "date-time",
         "description": "Due date and time in ISO 8601 format (e.g., '2024-12-31T23:59:00.000Z' or '2024-12-31T15:30:00')."
     },
     "Attachments": {
@@ -35,6 +36,24 @@ AIRTABLE_FIELDS_SCHEMA = {
     }
 }
 
+# Airtable record IDs look like 'rec' followed by 14 alphanumeric characters
+RECORD_ID_SCHEMA = {
+    "type": "string",
+    "pattern": "^rec[A-Za-z0-9]{14}$",
+}
+
+def build_record_id_parameter(description: str):
+    """
+    Build a record ID parameter object for Airtable tools.
+    
+    Args:
+        description: Description for the record ID parameter
+    
+    Returns:
+        Dictionary representing the record ID parameter schema
+    """
+    return {**RECORD_ID_SCHEMA, "description": description}
+
 def build_fields_parameter(description: str, required_fields: list = None):
     """
     Build a fields parameter object for Airtable tools.
@@ -49,7 +68,8 @@ def build_fields_parameter(description: str, required_fields: list = None):
     schema = {
         "type": "object",
         "description": description,
-        "properties": AIRTABLE_FIELDS_SCHEMA.copy()
+        "properties": AIRTABLE_FIELDS_SCHEMA.copy(),
+        "additionalProperties": False
     }
     
     if required_fields:
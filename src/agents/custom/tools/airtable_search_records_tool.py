@@ -0,0 +1,45 @@
+from openai.types.chat import ChatCompletionToolParam
+
+from .tool import Tool
+
+import src.services.airtable_service as airtable_service
+
+class AirtableSearchRecordsTool(Tool):
+    function_definition = ChatCompletionToolParam(
+        type="function",
+        function={
+            "name": "search_tasks",
+            "description": (
+                "Full-text search over the Name and Notes of tasks in the backlog. "
+                "Returns the best matching record IDs with short snippets. "
+                "Prefer this over fetching all records when looking for specific tasks."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "query": {
+                        "type": "string",
+                        "description": "Words to search for, e.g. 'invoice migration'"
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "minimum": 1,
+                        "maximum": 20,
+                        "description": "Maximum number of results (default 5)"
+                    }
+                },
+                "additionalProperties": False,
+                "required": ["query"]
+            }
+        }
+    )
+
+    def __call__(self, query: str, limit: int = 5) -> str:
+        hits = airtable_service.search_records("Backlog", query, limit)
+        if not hits:
+            return f"No tasks match '{query}'."
+
+        lines = [f"{len(hits)} matching task(s) as `id | Name | Status | snippet`:"]
+        for hit in hits:
+            lines.append(f"{hit['record_id']} | {hit['name']} | {hit['status']} | {hit['snippet']}")
+        return "\n".join(lines)
@@ -3,7 +3,7 @@ from typing import Dict
 from openai.types.chat import ChatCompletionToolParam
 
 from .tool import Tool
-from .airtable_schemas import build_fields_parameter
+from .airtable_schemas import build_fields_parameter, build_record_id_parameter
 
 import src.services.airtable_service as airtable_service
 
@@ -16,14 +16,12 @@ class AirtableUpdateRecordTool(Tool):
             "parameters": {
                 "type": "object",
                 "properties": {
-                    "record_id": {
-                        "type": "string",
-                        "description": "The ID of the record to update"
-                    },
+                    "record_id": build_record_id_parameter("The ID of the record to update"),
                     "fields": build_fields_parameter(
                         description="A dictionary of Airtable field names and their new values."
                     )
                 },
+                "additionalProperties": False,
                 "required": ["record_id", "fields"]
             }
         }
@@ -0,0 +1,118 @@
+# Tool argument validation against each tool's JSON schema
+
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from jsonschema import Draft202012Validator, FormatChecker
+
+# Only the formats used by our tool schemas, so checks never depend on optional jsonschema extras
+_FORMAT_CHECKER = FormatChecker(formats=())
+
+
+def _parse_iso_datetime(value: str) -> datetime:
+    # fromisoformat accepts 'Z', fractional seconds and date-only values on Python 3.11+
+    return datetime.fromisoformat(value.strip())
+
+
+@_FORMAT_CHECKER.checks("date-time", raises=ValueError)
+def _is_iso_datetime(value: Any) -> bool:
+    if not isinstance(value, str):
+        return True
+    _parse_iso_datetime(value)
+    return True
+
+
+class ToolArgumentError(ValueError):
+    """Raised when tool call arguments don't match the tool's schema."""
+
+    def __init__(self, tool_name: str, errors: List[str]):
+        self.tool_name = tool_name
+        self.errors = errors
+        super().__init__(f"Invalid arguments for tool '{tool_name}': " + "; ".join(errors))
+
+
+class ArgumentValidator:
+    """
+    Compiled validator for a tool's `parameters` schema.
+
+    Arguments are normalized first (whitespace, enum casing, ISO 8601 dates) so that
+    near-misses from the model are accepted, then validated so that real mistakes
+    are reported before the tool runs.
+    """
+
+    def __init__(self, tool_name: str, schema: Dict):
+        """
+        Compile the validator.
+
+        Args:
+            tool_name: Name of the tool, used in error messages
+            schema: JSON schema of the tool's parameters
+
+        Raises:
+            jsonschema.SchemaError: If the schema itself is invalid
+        """
+        Draft202012Validator.check_schema(schema)
+        self.tool_name = tool_name
+        self.schema = schema
+        self._validator = Draft202012Validator(schema, format_checker=_FORMAT_CHECKER)
+
+    def validate(self, args: Any) -> Any:
+        """
+        Normalize and validate tool call arguments.
+
+        Args:
+            args: Decoded JSON arguments from the model
+
+        Returns:
+            The normalized arguments
+
+        Raises:
+            ToolArgumentError: If the arguments don't match the schema
+        """
+        args = _normalize(args, self.schema)
+        errors = sorted(self._validator.iter_errors(args), key=lambda error: list(error.absolute_path))
+        if errors:
+            raise ToolArgumentError(self.tool_name, [_describe(error) for error in errors])
+        return args
+
+
+def _normalize(value: Any, schema: Dict) -> Any:
+    """Recursively normalize a value according to its schema, leaving unknown shapes untouched."""
+    if isinstance(value, dict) and "properties" in schema:
+        properties = schema["properties"]
+        return {
+            key: _normalize(item, properties[key]) if key in properties else item
+            for key, item in value.items()
+        }
+
+    if isinstance(value, list) and isinstance(schema.get("items"), dict):
+        return [_normalize(item, schema["items"]) for item in value]
+
+    if isinstance(value, str):
+        value = value.strip()
+        if "enum" in schema and value not in schema["enum"]:
+            matches = [option for option in schema["enum"] if str(option).casefold() == value.casefold()]
+            if len(matches) == 1:
+                return matches[0]
+        if schema.get("format") == "date-time":
+            try:
+                parsed = _parse_iso_datetime(value)
+            except ValueError:
+                return value  # Reported by the format checker
+            if parsed.tzinfo is not None:
+                return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            return parsed.isoformat(timespec="seconds")
+
+    return value
+
+
+def _describe(error) -> str:
+    """Turn a jsonschema error into a short message pointing at the offending argument."""
+    path = ".".join(str(part) for part in error.absolute_path) or "arguments"
+
+    if error.validator == "additionalProperties":
+        allowed = list(error.schema.get("properties", {}))
+        return f"{path}: {error.message}. Allowed: {allowed}"
+    if error.validator == "format":
+        return f"{path}: {error.instance!r} is not a valid ISO 8601 {error.validator_value}"
+    return f"{path}: {error.message}"
@@ -13,3 +13,7 @@ class Tool(ABC):
     @abstractmethod
     def __call__(self, *args) -> str:
         ...
+
+    def snapshot(self) -> str:
+        """Compact output of an argument-less call, used to seed the model's context."""
+        return self()
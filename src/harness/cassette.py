@@ -0,0 +1,166 @@
+"""
+Capture of agent sessions into cassette files for offline replay.
+
+A cassette holds one `Agent.run`: the prompt, every OpenAI request and response, and
+every Airtable service call with its result and latency.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+import src.services.airtable_service as airtable_service
+
+logger = logging.getLogger(__name__)
+
+# Airtable service functions captured and replayed; their arguments and results are JSON
+AIRTABLE_FUNCTIONS = (
+    "create_record",
+    "get_all_records",
+    "iterate_records",
+    "search_records",
+    "update_record",
+    "delete_record",
+    "batch_upsert_records",
+)
+
+KIND_OPENAI = "openai"
+KIND_AIRTABLE = "airtable"
+
+
+@dataclass
+class Cassette:
+    """One recorded agent session."""
+    prompt: str
+    events: List[Dict] = field(default_factory=list)
+    reply: Optional[str] = None
+    duration: float = 0.0
+    recorded_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f, ensure_ascii=False, indent=1)
+
+    @classmethod
+    def load(cls, path: str) -> "Cassette":
+        with open(path, encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+
+def load_cassettes(directory: str) -> List[Cassette]:
+    """Load every cassette in a directory, in file name order."""
+    names = sorted(name for name in os.listdir(directory) if name.endswith(".json"))
+    return [Cassette.load(os.path.join(directory, name)) for name in names]
+
+
+# The cassette of the run being recorded in the current context
+_current_cassette: ContextVar[Optional["Cassette"]] = ContextVar("recording_cassette", default=None)
+# Set while a recorded service call runs, so the service calls it makes itself aren't recorded too
+_in_recorded_call: ContextVar[bool] = ContextVar("in_recorded_call", default=False)
+
+
+class TrafficRecorder:
+    """
+    Records agent runs into one cassette file per run.
+
+    Attaching to an agent wraps its run and complete methods, and wraps the Airtable
+    service functions used by the tools. Each run binds its cassette to its context,
+    so only calls made on behalf of that run (including from threads started in its
+    context) are recorded into it, and concurrent runs get separate cassettes. Model
+    calls are recorded once per completed call, after retries and hedging.
+    """
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self._lock = threading.Lock()
+        self._count = 0
+        self._patched_airtable = False
+
+    def attach(self, agent) -> None:
+        """Start recording the runs of an agent."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        agent.complete = self._wrap_complete(agent.complete, agent.model)
+        agent.run = self._wrap_run(agent.run)
+        with self._lock:
+            if not self._patched_airtable:
+                for name in AIRTABLE_FUNCTIONS:
+                    setattr(airtable_service, name, self._wrap_airtable(name, getattr(airtable_service, name)))
+                self._patched_airtable = True
+        logger.info(f"Recording agent sessions to {self.output_dir}")
+
+    def record(self, kind: str, **event: Any) -> None:
+        """Append an event to the cassette of the run in the current context, if any."""
+        cassette = _current_cassette.get()
+        if cassette is not None:
+            with self._lock:
+                cassette.events.append({"kind": kind, **event})
+
+    def _wrap_run(self, run):
+        @wraps(run)
+        def wrapper(initial_prompt: str):
+            cassette = Cassette(prompt=initial_prompt)
+            with self._lock:
+                self._count += 1
+                number = self._count
+            token = _current_cassette.set(cassette)
+            started = time.perf_counter()
+            try:
+                cassette.reply = run(initial_prompt)
+                return cassette.reply
+            finally:
+                cassette.duration = time.perf_counter() - started
+                _current_cassette.reset(token)
+                name = f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{number}.json"
+                try:
+                    cassette.save(os.path.join(self.output_dir, name))
+                except OSError as e:
+                    logger.error(f"Failed to save cassette {name}: {e}")
+        return wrapper
+
+    def _wrap_complete(self, complete, model: str):
+        @wraps(complete)
+        def wrapper(messages, deadline=None, **options):
+            if _current_cassette.get() is None:
+                return complete(messages, deadline, **options)
+            started = time.perf_counter()
+            response = complete(messages, deadline, **options)
+            self.record(
+                KIND_OPENAI,
+                request=json.loads(json.dumps({"model": model, "messages": messages, **options}, default=str)),
+                response=response.model_dump(mode="json"),
+                latency=time.perf_counter() - started,
+            )
+            return response
+        return wrapper
+
+    def _wrap_airtable(self, name: str, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_cassette.get() is None or _in_recorded_call.get():
+                return func(*args, **kwargs)
+            token = _in_recorded_call.set(True)
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+                if name == "iterate_records":
+                    # Materialize the pages so they can be stored and replayed
+                    result = list(result)
+            finally:
+                _in_recorded_call.reset(token)
+            self.record(
+                KIND_AIRTABLE,
+                function=name,
+                args=list(args),
+                kwargs=kwargs,
+                result=result,
+                latency=time.perf_counter() - started,
+            )
+            return iter(result) if name == "iterate_records" else result
+        return wrapper
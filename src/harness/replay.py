@@ -0,0 +1,244 @@
+"""
+Offline load testing of the agent loop by replaying recorded cassettes.
+
+Each replayed session runs through a headless interface whose OpenAI client and
+Airtable service calls are served from a cassette, optionally with the recorded
+latencies, so realistic multi-step conversations can be driven concurrently without
+spending tokens or touching a live base.
+"""
+
+import json
+import logging
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from openai.types.chat import ChatCompletion
+
+import src.services.airtable_service as airtable_service
+from interfaces.base import BaseInterface
+from .cassette import AIRTABLE_FUNCTIONS, KIND_AIRTABLE, KIND_OPENAI, Cassette
+
+logger = logging.getLogger(__name__)
+
+# The session whose cassette serves Airtable calls made in the current context
+_current_session: ContextVar[Optional["ReplaySession"]] = ContextVar("replay_session", default=None)
+
+
+class ReplayError(Exception):
+    """Raised when a replayed session makes a call its cassette has no answer for."""
+    pass
+
+
+class ReplaySession:
+    """Serves one cassette's recorded responses, in order, to a replayed run."""
+
+    def __init__(self, cassette: Cassette, latency_scale: float = 1.0):
+        """
+        Initialize the session.
+
+        Args:
+            cassette: The recorded session
+            latency_scale: Multiplier for recorded latencies (0 replays without delays)
+        """
+        self.cassette = cassette
+        self.latency_scale = latency_scale
+        self._openai = [event for event in cassette.events if event["kind"] == KIND_OPENAI]
+        self._airtable: Dict[str, deque] = defaultdict(deque)
+        for event in cassette.events:
+            if event["kind"] == KIND_AIRTABLE:
+                self._airtable[event["function"]].append(event)
+        self._last_airtable: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        # Model calls whose messages matched no recorded request, i.e. the conversation drifted
+        self.diverged = 0
+
+    def next_completion(self, messages: Optional[List] = None) -> ChatCompletion:
+        """
+        Serve the recorded response to a model call.
+
+        The response recorded for the same messages is preferred, so concurrent calls
+        (e.g. chunks of a backlog review) each get their own answer; otherwise the
+        earliest unused response is served and the session counts as diverged.
+        """
+        messages = json.loads(json.dumps(messages, default=str)) if messages is not None else None
+        with self._lock:
+            if not self._openai:
+                raise ReplayError("Cassette has no more OpenAI responses")
+            position = next(
+                (i for i, event in enumerate(self._openai) if event["request"].get("messages") == messages),
+                None,
+            )
+            if position is None:
+                self.diverged += 1
+                position = 0
+            event = self._openai.pop(position)
+        self._wait(event)
+        return ChatCompletion.model_validate(event["response"])
+
+    def airtable_result(self, function: str):
+        with self._lock:
+            if self._airtable[function]:
+                event = self._last_airtable[function] = self._airtable[function].popleft()
+            elif function in self._last_airtable:
+                # Extra calls (e.g. a prefetch not made while recording) get the latest answer again
+                event = self._last_airtable[function]
+            else:
+                raise ReplayError(f"Cassette has no recorded '{function}' call")
+        self._wait(event)
+        return event["result"]
+
+    def _wait(self, event: Dict) -> None:
+        if self.latency_scale > 0:
+            time.sleep(event.get("latency", 0) * self.latency_scale)
+
+
+class ReplayClient:
+    """Stand-in for the OpenAI client that answers from a replay session."""
+
+    def __init__(self):
+        self.session: Optional[ReplaySession] = None
+        self.chat = self
+        self.completions = self
+
+    def create(self, **kwargs) -> ChatCompletion:
+        return self.session.next_completion(kwargs.get("messages"))
+
+
+class ReplayInterface(BaseInterface):
+    """Headless interface used to replay sessions through the normal agent setup."""
+
+    def start(self):
+        pass
+
+    def send_message(self, message: str):
+        pass
+
+
+def install_airtable_replay() -> None:
+    """Route the Airtable service functions to the replay session of the calling context."""
+    for function in AIRTABLE_FUNCTIONS:
+        setattr(airtable_service, function, _airtable_replayer(function))
+
+
+def _airtable_replayer(function: str):
+    def replay(*args, **kwargs):
+        session = _current_session.get()
+        if session is None:
+            raise ReplayError(f"'{function}' called outside of a replay session")
+        result = session.airtable_result(function)
+        return iter(result) if function == "iterate_records" else result
+    replay.__name__ = function
+    return replay
+
+
+@dataclass
+class LoadReport:
+    """Latency and throughput of a load test run."""
+    sessions: int
+    errors: int
+    diverged: int
+    duration: float
+    throughput: float
+    latencies: List[float]
+
+    def percentile(self, fraction: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def format(self) -> str:
+        lines = [
+            f"Sessions: {self.sessions} ({self.errors} failed, {self.diverged} diverged from their recording) "
+            f"in {self.duration:.1f}s",
+            f"Throughput: {self.throughput:.2f} sessions/s",
+        ]
+        if self.latencies:
+            lines.append(
+                f"Latency: mean {statistics.mean(self.latencies):.3f}s, "
+                + ", ".join(f"p{int(p * 100)} {self.percentile(p):.3f}s" for p in (0.5, 0.9, 0.95, 0.99))
+                + f", max {max(self.latencies):.3f}s"
+            )
+        return "\n".join(lines)
+
+
+def run_load(
+    cassettes: List[Cassette],
+    sessions: int,
+    arrival_rate: float,
+    concurrency: int = 8,
+    latency_scale: float = 1.0,
+    seed: Optional[int] = None,
+) -> LoadReport:
+    """
+    Replay cassettes concurrently with Poisson arrivals and measure the agent loop.
+
+    Latency is measured from each session's scheduled arrival, so time spent waiting
+    for a free worker counts, as it would for a user.
+
+    Args:
+        cassettes: Recorded sessions, replayed round-robin
+        sessions: Number of sessions to run
+        arrival_rate: Mean session arrivals per second
+        concurrency: Maximum sessions in flight
+        latency_scale: Multiplier for recorded OpenAI and Airtable latencies
+        seed: Seed for the arrival process, for repeatable runs
+
+    Returns:
+        The load report
+    """
+    if not cassettes:
+        raise ValueError("No cassettes to replay")
+
+    install_airtable_replay()
+    workers = threading.local()
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    errors = 0
+    diverged = 0
+    lock = threading.Lock()
+
+    def replay(cassette: Cassette, arrival: float) -> None:
+        nonlocal errors, diverged
+        if not hasattr(workers, "interface"):
+            workers.interface = ReplayInterface()
+            workers.client = workers.interface.agent.client = ReplayClient()
+        session = ReplaySession(cassette, latency_scale)
+        workers.client.session = session
+        _current_session.set(session)
+        try:
+            workers.interface.process_user_input(cassette.prompt)
+            with lock:
+                latencies.append(time.perf_counter() - arrival)
+                diverged += session.diverged > 0
+        except Exception as e:
+            logger.warning(f"Replayed session failed: {e}")
+            with lock:
+                errors += 1
+
+    started = time.perf_counter()
+    arrival = started
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="replay") as executor:
+        for number in range(sessions):
+            arrival += rng.expovariate(arrival_rate)
+            if (delay := arrival - time.perf_counter()) > 0:
+                time.sleep(delay)
+            # Each session gets its own context, so its Airtable calls find its cassette
+            executor.submit(copy_context().run, replay, cassettes[number % len(cassettes)], arrival)
+    duration = time.perf_counter() - started
+
+    return LoadReport(
+        sessions=sessions,
+        errors=errors,
+        diverged=diverged,
+        duration=duration,
+        throughput=len(latencies) / duration if duration else 0.0,
+        latencies=latencies,
+    )
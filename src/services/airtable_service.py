@@ -1,28 +1,23 @@
+import base64
+import io
+import json
 import os
-import time
-from dataclasses import dataclass
+import threading
+from dataclasses import asdict, dataclass
 from functools import wraps
+from typing import BinaryIO, Callable, Iterator
 
 from pyairtable import Api
-from pyairtable.api.types import WritableFields, RecordDict, RecordDeletedDict
+from pyairtable.api.types import WritableFields, RecordDict, RecordDeletedDict, UpsertResultDict
 
-# Simple rate limiter - 5 requests per second max
-_last_call_time = 0
-_min_interval = 1.0 / 5  # 0.2 seconds between calls
+from src.services.rate_limiter import create_rate_limiter
+from src.services.search_index import SearchIndex
 
 def rate_limit(func):
-    """Decorator to rate limit function calls to 5 per second"""
+    """Decorator to rate limit function calls to 5 per second per base, across processes"""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        global _last_call_time
-        current_time = time.time()
-        time_since_last_call = current_time - _last_call_time
-        
-        if time_since_last_call < _min_interval:
-            sleep_time = _min_interval - time_since_last_call
-            time.sleep(sleep_time)
-        
-        _last_call_time = time.time()
+        _rate_limiter.acquire()
         return func(*args, **kwargs)
     return wrapper
 
@@ -34,21 +29,278 @@ class EnvConfig:
 
 env_config = EnvConfig()
 
+# Airtable allows 5 requests per second per base, shared by every process using it.
+# Wrap bulk jobs in `with rate_limiter.priority(PRIORITY_BULK):` so interactive chats go first.
+_rate_limiter = create_rate_limiter(5, env_config.AIRTABLE_BASE_ID)
+
+# Airtable accepts at most 10 records per batch request
+MAX_BATCH_SIZE = 10
+
+# Airtable's uploadAttachment endpoint accepts files up to 5 MB
+MAX_ATTACHMENT_BYTES = 5 * 1024 * 1024
+_CONTENT_API_URL = "https://content.airtable.com/v0"
+# (connect, read) timeouts for uploads, so a stalled transfer can't hold an upload slot forever
+_UPLOAD_TIMEOUT = (10, 120)
+
 api = Api(env_config.AIRTABLE_API_KEY)
 base = api.base(env_config.AIRTABLE_BASE_ID)
 
+# Search indexes per table, built on first use and kept current by the functions below
+_search_indexes: dict[str, SearchIndex] = {}
+_search_indexes_lock = threading.Lock()
+# Writes made while a table's index is being built, replayed onto it once the build is done
+_pending_index_writes: dict[str, list[Callable[[SearchIndex], None]]] = {}
+_index_build_locks: dict[str, threading.Lock] = {}
+
+def get_search_index(table_name: str) -> SearchIndex:
+    """
+    Get the full-text search index of a table, loading the table on first use.
+
+    The table is read without holding the module lock, so writes to it can proceed
+    during the build; they are recorded and applied to the index before it is used.
+
+    Args:
+        table_name: Name or ID of the table
+
+    Returns:
+        The table's SearchIndex
+    """
+    with _search_indexes_lock:
+        if (index := _search_indexes.get(table_name)) is not None:
+            return index
+        build_lock = _index_build_locks.setdefault(table_name, threading.Lock())
+
+    # Only one thread builds a table's index; the others wait here for its result
+    with build_lock:
+        with _search_indexes_lock:
+            if (index := _search_indexes.get(table_name)) is not None:
+                return index
+            _pending_index_writes[table_name] = []
+
+        index = SearchIndex()
+        try:
+            index.rebuild(record for page in iterate_records(table_name) for record in page)
+        except BaseException:
+            with _search_indexes_lock:
+                del _pending_index_writes[table_name]
+            raise
+
+        with _search_indexes_lock:
+            for apply in _pending_index_writes.pop(table_name):
+                apply(index)
+            _search_indexes[table_name] = index
+        return index
+
+def search_records(table_name: str, query: str, limit: int = 5) -> list[dict]:
+    """
+    Full-text search over a table's records.
+
+    Args:
+        table_name: Name or ID of the table
+        query: Free-text query
+        limit: Maximum number of hits
+
+    Returns:
+        Hits ordered by relevance, as dicts with record_id, score, name, status and snippet
+    """
+    return [asdict(hit) for hit in get_search_index(table_name).search(query, limit)]
+
+def _update_search_index(table_name: str, apply: Callable[[SearchIndex], None]) -> None:
+    """Apply a write to the table's index, or queue it if the index is being built."""
+    with _search_indexes_lock:
+        index = _search_indexes.get(table_name)
+        if index is None:
+            if (pending := _pending_index_writes.get(table_name)) is not None:
+                pending.append(apply)
+            return
+    apply(index)
+
 @rate_limit
 def create_record(table_name: str, fields: WritableFields) -> RecordDict:
-    return base.table(table_name).create(fields)
+    record = base.table(table_name).create(fields)
+    _update_search_index(table_name, lambda index: index.upsert(record))
+    return record
 
-@rate_limit
 def get_all_records(table_name: str) -> list[RecordDict]:
-    return base.table(table_name).all()
+    index = _search_indexes.get(table_name)
+    started = index.sequence if index is not None else None
+    # Each 100-record page is its own request, so the rate limit is taken per page
+    records = [record for page in iterate_records(table_name) for record in page]
+    # A full read is a free chance to pick up changes made outside this process;
+    # only records that changed since the index last saw them are re-indexed, and
+    # records written by this process while the read was running are left alone
+    if index is not None:
+        index.sync(records, since=started)
+    return records
+
+def iterate_records(table_name: str, page_size: int = 100) -> Iterator[list[RecordDict]]:
+    """
+    Stream a table page by page instead of loading it all at once.
+
+    Each page is a separate request, so each one is rate limited on its own.
+
+    Args:
+        table_name: Name or ID of the table
+        page_size: Records per page (Airtable allows at most 100)
+
+    Yields:
+        Lists of up to page_size records
+    """
+    pages = base.table(table_name).iterate(page_size=page_size)
+    while True:
+        _rate_limiter.acquire()
+        page = next(pages, None)
+        if page is None:
+            return
+        yield page
 
 @rate_limit
 def delete_record(table_name: str, record_id: str) -> RecordDeletedDict:
-    return base.table(table_name).delete(record_id)
+    deleted = base.table(table_name).delete(record_id)
+    if deleted.get("deleted"):
+        _update_search_index(table_name, lambda index: index.remove(record_id))
+    return deleted
 
 @rate_limit
 def update_record(table_name: str, record_id: str, fields: WritableFields) -> RecordDict:
-    return base.table(table_name).update(record_id, fields)
\ No newline at end of file
+    # Airtable returns the full updated record, so the index entry can be replaced as is
+    record = base.table(table_name).update(record_id, fields)
+    _update_search_index(table_name, lambda index: index.upsert(record))
+    return record
+
+@rate_limit
+def batch_upsert_records(
+    table_name: str,
+    records: list[WritableFields],
+    key_fields: list[str],
+    typecast: bool = False,
+) -> UpsertResultDict:
+    """
+    Create or update up to MAX_BATCH_SIZE records in a single request.
+
+    Records whose key_fields values match an existing record update it, the rest are
+    created, so repeating a batch is harmless.
+
+    Args:
+        table_name: Name or ID of the table
+        records: Field values of each record
+        key_fields: Fields identifying a record across imports
+        typecast: Let Airtable convert string values to the field types
+
+    Returns:
+        The created and updated records
+    """
+    if len(records) > MAX_BATCH_SIZE:
+        raise ValueError(f"At most {MAX_BATCH_SIZE} records per batch, got {len(records)}")
+
+    result = base.table(table_name).batch_upsert(
+        [{"fields": fields} for fields in records], key_fields=key_fields, typecast=typecast
+    )
+    def apply(index: SearchIndex) -> None:
+        for record in result["records"]:
+            index.upsert(record)
+    _update_search_index(table_name, apply)
+    return result
+
+class _Base64JsonBody:
+    """
+    File-like request body for uploadAttachment that base64-encodes the source lazily.
+
+    The JSON envelope is written around the encoded stream, so only one chunk of the
+    file is held in memory at a time while still sending an exact Content-Length.
+    The body can be rewound to its start (urllib3 does so before retrying a 429),
+    which restarts the encoding from where the source stream began.
+    """
+
+    _CHUNK_SIZE = 48 * 1024  # Multiple of 3, so chunks encode without padding
+
+    def __init__(self, stream: BinaryIO, size: int, filename: str, content_type: str):
+        envelope = json.dumps({"contentType": content_type, "filename": filename, "file": ""})
+        prefix, suffix = envelope.rsplit('""', 1)
+        self._prefix = (prefix + '"').encode()
+        self._suffix = ('"' + suffix).encode()
+        self._stream = stream
+        self._start = stream.tell()
+        self._length = len(self._prefix) + 4 * ((size + 2) // 3) + len(self._suffix)
+        self._position = None
+        self.seek(0)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> bytes:
+        data = self.read(self._CHUNK_SIZE)
+        if not data:
+            raise StopIteration
+        return data
+
+    def _generate(self):
+        yield self._prefix
+        while chunk := self._stream.read(self._CHUNK_SIZE):
+            yield base64.b64encode(chunk)
+        yield self._suffix
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence != io.SEEK_SET or offset not in (0, self._position):
+            raise io.UnsupportedOperation("the upload body can only be rewound to its start")
+        if offset == 0:
+            self._stream.seek(self._start)
+            self._parts = self._generate()
+            self._pending = b""
+            self._position = 0
+        return self._position
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._pending) < size:
+            part = next(self._parts, None)
+            if part is None:
+                break
+            self._pending += part
+        if size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        self._position += len(data)
+        return data
+
+
+@rate_limit
+def upload_attachment(
+    record_id: str,
+    field_name: str,
+    stream: BinaryIO,
+    size: int,
+    filename: str,
+    content_type: str,
+) -> dict:
+    """
+    Stream a file into an attachment field of an existing record.
+
+    Args:
+        record_id: ID of the record to attach the file to
+        field_name: Name or ID of the attachment field
+        stream: Binary stream positioned at the start of the file
+        size: Size of the file in bytes
+        filename: Name to give the attachment in Airtable
+        content_type: MIME type of the file
+
+    Returns:
+        The Airtable response, including the record's updated attachment fields
+    """
+    if size > MAX_ATTACHMENT_BYTES:
+        raise ValueError(f"Attachment is {size} bytes, Airtable accepts at most {MAX_ATTACHMENT_BYTES}")
+
+    url = f"{_CONTENT_API_URL}/{env_config.AIRTABLE_BASE_ID}/{record_id}/{field_name}/uploadAttachment"
+    response = api.session.post(
+        url,
+        data=_Base64JsonBody(stream, size, filename, content_type),
+        headers={"Content-Type": "application/json"},
+        timeout=_UPLOAD_TIMEOUT,
+    )
+    response.raise_for_status()
+    return response.json()
@@ -0,0 +1,246 @@
+"""
+Streaming bulk import and export of Airtable tables as CSV or JSON lines.
+
+Records are read and written one page or batch at a time, so memory use does not
+grow with the size of the table. Imports upsert on a key field and checkpoint their
+progress, so an interrupted import can be re-run and resumes where it stopped.
+"""
+
+import csv
+import json
+import os
+from typing import Dict, Iterator, List, Optional, TextIO
+
+from tqdm import tqdm
+
+import src.services.airtable_service as airtable_service
+from src.services.rate_limiter import priority, PRIORITY_BULK
+
+FORMAT_CSV = "csv"
+FORMAT_JSONL = "jsonl"
+_FORMATS_BY_EXTENSION = {".csv": FORMAT_CSV, ".jsonl": FORMAT_JSONL, ".ndjson": FORMAT_JSONL}
+
+# CSV columns written by default, since CSV needs its header before the first record
+DEFAULT_CSV_FIELDS = ["Name", "Notes", "Status", "Due date / time", "Attachments"]
+
+# Columns carrying record metadata rather than field values
+_METADATA_COLUMNS = ("id", "createdTime")
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    """
+    Determine the file format from an explicit choice or the file extension.
+
+    Raises:
+        ValueError: If the format can't be determined
+    """
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in _FORMATS_BY_EXTENSION:
+        raise ValueError(f"Can't tell the format of '{path}', use --format {FORMAT_CSV} or {FORMAT_JSONL}")
+    return _FORMATS_BY_EXTENSION[extension]
+
+
+def export_records(
+    table_name: str,
+    path: str,
+    fmt: Optional[str] = None,
+    fields: Optional[List[str]] = None,
+    show_progress: bool = True,
+) -> int:
+    """
+    Stream a table to a CSV or JSON-lines file, page by page.
+
+    Args:
+        table_name: Name or ID of the table
+        path: File to write
+        fmt: 'csv' or 'jsonl' (detected from the extension if omitted)
+        fields: CSV columns to write (defaults to DEFAULT_CSV_FIELDS); JSON lines
+            always contain every field
+        show_progress: Whether to display a progress bar
+
+    Returns:
+        Number of records exported
+    """
+    fmt = detect_format(path, fmt)
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as f, \
+            tqdm(desc="Exporting", unit=" records", disable=not show_progress) as progress, \
+            priority(PRIORITY_BULK):
+        if fmt == FORMAT_CSV:
+            columns = fields or DEFAULT_CSV_FIELDS
+            writer = csv.DictWriter(f, fieldnames=["id", *columns], extrasaction="ignore")
+            writer.writeheader()
+
+        for page in airtable_service.iterate_records(table_name):
+            for record in page:
+                if fmt == FORMAT_CSV:
+                    writer.writerow({"id": record["id"], **_to_csv_values(record.get("fields", {}))})
+                else:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            count += len(page)
+            progress.update(len(page))
+    return count
+
+
+def import_records(
+    table_name: str,
+    path: str,
+    key_field: str = "Name",
+    fmt: Optional[str] = None,
+    checkpoint_path: Optional[str] = None,
+    typecast: bool = True,
+    show_progress: bool = True,
+) -> int:
+    """
+    Stream a CSV or JSON-lines file into a table with batched upserts.
+
+    Rows are matched to existing records on key_field, so re-running an import
+    updates rather than duplicates. Progress is checkpointed after every batch;
+    running the same import again skips the rows already written.
+
+    Args:
+        table_name: Name or ID of the table
+        path: File to read
+        key_field: Field identifying a record across imports
+        fmt: 'csv' or 'jsonl' (detected from the extension if omitted)
+        checkpoint_path: Checkpoint file (defaults to '<path>.checkpoint')
+        typecast: Let Airtable convert string values to the field types
+        show_progress: Whether to display a progress bar
+
+    Returns:
+        Number of rows imported by this call, excluding rows skipped on resume
+
+    Raises:
+        ValueError: If a row has no value for key_field
+    """
+    fmt = detect_format(path, fmt)
+    checkpoint_path = checkpoint_path or f"{path}.checkpoint"
+    checkpoint = _Checkpoint(checkpoint_path, path, key_field)
+    done = checkpoint.load()
+
+    imported = 0
+    batch: List[Dict] = []
+    batch_keys = set()
+
+    def flush():
+        nonlocal imported
+        airtable_service.batch_upsert_records(table_name, batch, [key_field], typecast=typecast)
+        imported += len(batch)
+        progress.update(len(batch))
+        checkpoint.save(done + imported)
+        batch.clear()
+        batch_keys.clear()
+
+    with open(path, newline="", encoding="utf-8") as f, \
+            tqdm(desc="Importing", unit=" rows", initial=done, disable=not show_progress) as progress, \
+            priority(PRIORITY_BULK):
+        for row_number, fields in enumerate(_read_rows(f, fmt), start=1):
+            if row_number <= done:
+                continue
+            fields = _writable_fields(fields)
+            key = fields.get(key_field)
+            if key in (None, ""):
+                raise ValueError(f"Row {row_number} has no value for key field '{key_field}'")
+            # Records sharing a key can't be upserted in the same request
+            key = json.dumps(key, sort_keys=True)
+            if key in batch_keys or len(batch) == airtable_service.MAX_BATCH_SIZE:
+                flush()
+            batch.append(fields)
+            batch_keys.add(key)
+        if batch:
+            flush()
+
+    checkpoint.clear()
+    return imported
+
+
+def _read_rows(f: TextIO, fmt: str) -> Iterator[Dict]:
+    """Yield the field values of each row, without metadata columns or empty cells."""
+    if fmt == FORMAT_CSV:
+        for row in csv.DictReader(f):
+            yield {
+                column: _from_csv_value(value)
+                for column, value in row.items()
+                if column not in _METADATA_COLUMNS and value not in (None, "")
+            }
+    else:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            # Accept both exported records ({"id", "fields"}) and plain field objects
+            yield row["fields"] if isinstance(row.get("fields"), dict) else {
+                column: value for column, value in row.items() if column not in _METADATA_COLUMNS
+            }
+
+
+def _writable_fields(fields: Dict) -> Dict:
+    """
+    Reduce exported attachment objects to the properties Airtable accepts on write.
+
+    Exports carry read-only properties (id, size, type, thumbnails); only url and
+    filename are sent, and Airtable downloads the file again from the url.
+    """
+    writable = {}
+    for name, value in fields.items():
+        if isinstance(value, list) and value and all(isinstance(item, dict) and "url" in item for item in value):
+            value = [{key: item[key] for key in ("url", "filename") if key in item} for item in value]
+        writable[name] = value
+    return writable
+
+
+def _to_csv_values(fields: Dict) -> Dict:
+    """Serialize lists and objects (e.g. attachments) as JSON so they survive a round trip."""
+    return {
+        name: json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict)) else value
+        for name, value in fields.items()
+    }
+
+
+def _from_csv_value(value: str):
+    """Decode cells written by _to_csv_values back into lists and objects."""
+    if value[:1] in ("[", "{"):
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            pass
+    return value
+
+
+class _Checkpoint:
+    """Number of rows of a source file already imported, stored next to it."""
+
+    def __init__(self, path: str, source: str, key_field: str):
+        self.path = path
+        stat = os.stat(source)
+        # A checkpoint only applies to the exact file and key it was written for
+        self._identity = {
+            "source": os.path.abspath(source),
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "key_field": key_field,
+        }
+
+    def load(self) -> int:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return 0
+        if state.get("identity") != self._identity:
+            return 0
+        return int(state.get("rows_done", 0))
+
+    def save(self, rows_done: int) -> None:
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"identity": self._identity, "rows_done": rows_done}, f)
+        os.replace(temporary, self.path)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,151 @@
+import os
+import struct
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Priority classes: how far ahead (in seconds) a caller may book a request slot.
+# Interactive callers queue for the next free slot; bulk callers only take a slot
+# that is free right now, so they always yield to anyone already waiting.
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BULK = "bulk"
+PRIORITY_HORIZONS: Dict[str, float] = {
+    PRIORITY_INTERACTIVE: float("inf"),
+    PRIORITY_BULK: 0.0,
+}
+
+# Bulk callers poll for a free slot at this interval
+_POLL_INTERVAL = 0.02
+# Drift of the monotonic clock's wall-clock origin tolerated before state is considered stale
+_ORIGIN_TOLERANCE = 1.0
+
+_current_priority: ContextVar[str] = ContextVar("airtable_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def priority(name: str) -> Iterator[None]:
+    """Run the enclosed Airtable calls with the given priority class."""
+    if name not in PRIORITY_HORIZONS:
+        raise ValueError(f"Unknown priority '{name}'. Expected one of {list(PRIORITY_HORIZONS)}")
+    token = _current_priority.set(name)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+class RateLimiter(ABC):
+    """
+    Slot-booking rate limiter that spaces calls at least 1/rate seconds apart.
+
+    The shared state is a single timestamp: the earliest time the next call may start.
+    A caller books that slot by moving it forward one interval, then sleeps until it.
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+
+    def acquire(self) -> None:
+        """Block until the caller may make one request at its current priority."""
+        horizon = PRIORITY_HORIZONS[_current_priority.get()]
+        while True:
+            with self._next_slot() as slot:
+                now = time.monotonic()
+                start = max(slot[0], now)
+                if start - now <= horizon:
+                    slot[0] = start + self.interval
+                    break
+            time.sleep(min(start - now, _POLL_INTERVAL))
+
+        if (delay := start - time.monotonic()) > 0:
+            time.sleep(delay)
+
+    @abstractmethod
+    @contextmanager
+    def _next_slot(self) -> Iterator[List[float]]:
+        """Hold the limiter's lock and yield the next free slot as a mutable one-item list."""
+        ...
+
+
+class ProcessRateLimiter(RateLimiter):
+    """Rate limiter whose state is shared by the threads of this process only."""
+
+    def __init__(self, rate: float):
+        super().__init__(rate)
+        self._slot = [0.0]
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _next_slot(self) -> Iterator[List[float]]:
+        with self._lock:
+            yield self._slot
+
+
+class FileRateLimiter(RateLimiter):
+    """
+    Rate limiter shared by all processes on this host through a locked state file.
+
+    Requires fcntl (POSIX). time.monotonic is system-wide on Linux and macOS, so
+    slots booked by one process are meaningful to the others. It restarts at boot,
+    so the file also stores the wall-clock time the monotonic clock started from;
+    state written under a different origin is from before a reboot and is ignored.
+    """
+
+    _FORMAT = "dd"  # Next slot, monotonic clock origin
+
+    def __init__(self, rate: float, path: str):
+        if fcntl is None:
+            raise RuntimeError("FileRateLimiter requires fcntl, which is not available on this platform")
+        super().__init__(rate)
+        self.path = path
+        self._lock = threading.Lock()
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+
+    @contextmanager
+    def _next_slot(self) -> Iterator[List[float]]:
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                origin = time.time() - time.monotonic()
+                data = os.pread(self._fd, struct.calcsize(self._FORMAT), 0)
+                slot = [0.0]
+                if len(data) == struct.calcsize(self._FORMAT):
+                    next_slot, stored_origin = struct.unpack(self._FORMAT, data)
+                    if abs(origin - stored_origin) <= _ORIGIN_TOLERANCE:
+                        slot[0] = next_slot
+                yield slot
+                os.pwrite(self._fd, struct.pack(self._FORMAT, slot[0], origin), 0)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+def create_rate_limiter(rate: float, key: str) -> RateLimiter:
+    """
+    Create the rate limiter configured by the environment.
+
+    AIRTABLE_RATE_LIMIT_BACKEND selects 'file' (default where supported) or 'process'.
+    AIRTABLE_RATE_LIMIT_FILE overrides the state file, which defaults to one per key
+    in the system temp directory.
+
+    Args:
+        rate: Maximum calls per second
+        key: Identifies the shared limit, e.g. the Airtable base ID
+    """
+    backend = os.getenv("AIRTABLE_RATE_LIMIT_BACKEND", "file" if fcntl else "process")
+    if backend == "process":
+        return ProcessRateLimiter(rate)
+    if backend == "file":
+        path = os.getenv("AIRTABLE_RATE_LIMIT_FILE") or os.path.join(
+            tempfile.gettempdir(), f"agent_smith_airtable_{key}.ratelimit"
+        )
+        return FileRateLimiter(rate, path)
+    raise ValueError(f"Unknown AIRTABLE_RATE_LIMIT_BACKEND '{backend}'. Expected 'file' or 'process'")
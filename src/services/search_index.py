@@ -0,0 +1,254 @@
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_TOKEN_PATTERN = re.compile(r"[^\W_]+")
+_SNIPPET_RADIUS = 60
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_PATTERN.findall(text.casefold())
+
+
+@dataclass
+class SearchHit:
+    record_id: str
+    score: float
+    name: str
+    status: str
+    snippet: str
+
+
+class SearchIndex:
+    """
+    In-memory BM25 index over the text fields of Airtable records.
+
+    Records are added, replaced and removed one at a time, so the index can follow
+    writes without rebuilding. Each write is numbered, so a sync from a table read
+    can skip records written after the read started. Each term keeps its postings as NumPy arrays (built
+    lazily after a change), so a query is a handful of vectorized array operations.
+    """
+
+    def __init__(
+        self,
+        text_fields: Tuple[str, ...] = ("Name", "Notes"),
+        snippet_fields: Tuple[str, ...] = ("Notes",),
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        """
+        Initialize an empty index.
+
+        Args:
+            text_fields: Record fields whose text is indexed
+            snippet_fields: Record fields that snippets are taken from
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self.text_fields = text_fields
+        self.snippet_fields = snippet_fields
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        # Sequence number of the latest write, and of the latest write to each record
+        # (kept for removed records too, until a sync no longer needs them)
+        self._sequence = 0
+        self._written: Dict[str, int] = {}
+        self._clear()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number of the latest write, to pass to sync() for a read starting now."""
+        return self._sequence
+
+    def _clear(self) -> None:
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._ids: List[Optional[str]] = []
+        self._fields: List[Optional[Dict]] = []
+        self._terms: List[Optional[Counter]] = []
+        self._doc_len = np.zeros(0, dtype=np.float64)
+        self._total_len = 0.0
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    def rebuild(self, records: Iterable[Dict]) -> None:
+        """Replace the index contents with the given records."""
+        with self._lock:
+            self._clear()
+            for record in records:
+                self._upsert(record)
+
+    def sync(self, records: Iterable[Dict], since: Optional[int] = None) -> int:
+        """
+        Bring the index in line with a full read of the table, touching only what changed.
+
+        Records whose indexed fields are unchanged are skipped, so syncing an up to date
+        index costs a comparison per record rather than a rebuild.
+
+        Args:
+            records: Every record of the table
+            since: The index's sequence when the read started; records upserted or
+                removed after that are newer than the read and are left as they are
+
+        Returns:
+            Number of records added, replaced or removed
+        """
+        with self._lock:
+            def newer(record_id: str) -> bool:
+                return since is not None and self._written.get(record_id, 0) > since
+
+            seen = set()
+            changed = 0
+            for record in records:
+                seen.add(record["id"])
+                if newer(record["id"]):
+                    continue
+                slot = self._slots.get(record["id"])
+                if slot is None or self._fields[slot] != self._stored_fields(record.get("fields", {})):
+                    self._upsert(record)
+                    changed += 1
+            for record_id in [record_id for record_id in self._slots if record_id not in seen and not newer(record_id)]:
+                self._remove(record_id)
+                changed += 1
+            # Writes up to the read are reflected in it, so later syncs don't need them
+            horizon = self._sequence if since is None else since
+            self._written = {record_id: sequence for record_id, sequence in self._written.items() if sequence > horizon}
+            return changed
+
+    def upsert(self, record: Dict) -> None:
+        """Add a record, or replace it if it is already indexed."""
+        with self._lock:
+            self._upsert(record)
+            self._mark_written(record["id"])
+
+    def remove(self, record_id: str) -> None:
+        """Remove a record from the index, if present."""
+        with self._lock:
+            self._remove(record_id)
+            self._mark_written(record_id)
+
+    def _mark_written(self, record_id: str) -> None:
+        self._sequence += 1
+        self._written[record_id] = self._sequence
+
+    def search(self, query: str, limit: int = 5) -> List[SearchHit]:
+        """
+        Find the records that best match a query.
+
+        Args:
+            query: Free-text query
+            limit: Maximum number of hits
+
+        Returns:
+            Hits ordered by descending BM25 score
+        """
+        terms = set(tokenize(query))
+        with self._lock:
+            count = len(self._slots)
+            if not terms or not count:
+                return []
+
+            avg_len = max(self._total_len / count, 1.0)
+            length_norm = self.k1 * (1 - self.b + self.b * self._doc_len / avg_len)
+            scores = np.zeros(len(self._ids), dtype=np.float64)
+            for term in terms:
+                if term not in self._postings:
+                    continue
+                slots, tfs = self._posting_arrays(term)
+                idf = math.log(1 + (count - len(slots) + 0.5) / (len(slots) + 0.5))
+                scores[slots] += idf * tfs * (self.k1 + 1) / (tfs + length_norm[slots])
+
+            matched = np.flatnonzero(scores)
+            if len(matched) > limit:
+                matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+            matched = matched[np.argsort(-scores[matched], kind="stable")]
+
+            return [
+                SearchHit(
+                    record_id=self._ids[slot],
+                    score=float(scores[slot]),
+                    name=str(self._fields[slot].get("Name", "")),
+                    status=str(self._fields[slot].get("Status", "")),
+                    snippet=self._snippet(self._fields[slot], terms),
+                )
+                for slot in matched
+            ]
+
+    def _upsert(self, record: Dict) -> None:
+        record_id = record["id"]
+        self._remove(record_id)
+
+        fields = record.get("fields", {})
+        terms = Counter(token for name in self.text_fields for token in tokenize(str(fields.get(name, ""))))
+
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._ids)
+            self._ids.append(None)
+            self._fields.append(None)
+            self._terms.append(None)
+            if slot >= len(self._doc_len):
+                self._doc_len = np.concatenate([self._doc_len, np.zeros(max(slot, 16), dtype=np.float64)])
+
+        self._slots[record_id] = slot
+        self._ids[slot] = record_id
+        self._fields[slot] = self._stored_fields(fields)
+        self._terms[slot] = terms
+        self._doc_len[slot] = sum(terms.values())
+        self._total_len += self._doc_len[slot]
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[slot] = tf
+            self._arrays.pop(term, None)
+
+    def _stored_fields(self, fields: Dict) -> Dict:
+        """Return the subset of a record's fields kept for results and snippets."""
+        return {name: fields.get(name) for name in (*self.text_fields, *self.snippet_fields, "Status") if name in fields}
+
+    def _remove(self, record_id: str) -> None:
+        slot = self._slots.pop(record_id, None)
+        if slot is None:
+            return
+        for term in self._terms[slot]:
+            postings = self._postings[term]
+            del postings[slot]
+            if not postings:
+                del self._postings[term]
+            self._arrays.pop(term, None)
+        self._total_len -= self._doc_len[slot]
+        self._doc_len[slot] = 0
+        self._ids[slot] = None
+        self._fields[slot] = None
+        self._terms[slot] = None
+        self._free.append(slot)
+
+    def _posting_arrays(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (slots, term frequencies) for a term, cached until the term changes."""
+        if term not in self._arrays:
+            postings = self._postings[term]
+            self._arrays[term] = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float64, count=len(postings)),
+            )
+        return self._arrays[term]
+
+    def _snippet(self, fields: Dict, terms: set) -> str:
+        """Return a short excerpt around the first query term in the record's snippet fields."""
+        text = " | ".join(" ".join(str(fields[name]).split()) for name in self.snippet_fields if fields.get(name))
+        if not text:
+            return ""
+        positions = [match.start() for match in _TOKEN_PATTERN.finditer(text) if match.group().casefold() in terms]
+        center = positions[0] if positions else 0
+        start = max(0, center - _SNIPPET_RADIUS)
+        end = min(len(text), center + _SNIPPET_RADIUS)
+        return ("..." if start else "") + text[start:end] + ("..." if end < len(text) else "")
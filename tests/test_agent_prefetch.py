@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+from dotenv import load_dotenv
+from openai.types.chat import ChatCompletion
+
+load_dotenv()
+
+import src.services.airtable_service as airtable_service
+from src.agents.custom.agent import Agent, AgentError
+from src.agents.custom.profiling import RunProfiler
+from src.agents.custom.resilience import ResiliencePolicy
+from src.agents.custom.tools.airtable_get_all_records_tool import AirtableGetAllRecordsTool
+from src.agents.custom.tools.airtable_update_record_tool import AirtableUpdateRecordTool
+
+RECORD_ID = "recINVOICE0000001"
+
+def _completion(message):
+    return ChatCompletion.model_validate({
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", **message}}],
+    })
+
+def _tool_call(name, arguments):
+    return {"id": f"call_{name}", "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}}
+
+class ScriptedClient:
+    """Makes the scripted tool calls one step at a time, then answers with the last tool output."""
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.chat = self
+        self.completions = self
+
+    def create(self, messages, **kwargs):
+        if self.steps:
+            return _completion({"content": None, "tool_calls": [_tool_call(*self.steps.pop(0))]})
+        return _completion({"content": messages[-1]["content"]})
+
+class FakeTable:
+    """Serves the backlog, counting reads and optionally failing or stalling the first one."""
+
+    def __init__(self, fail_first=False, stall_first=False):
+        self.fail_first = fail_first
+        self.stall_first = stall_first
+        self.reads = 0
+        self.release = threading.Event()
+        self.status = "Todo"
+
+    def get_all_records(self, table_name):
+        self.reads += 1
+        if self.reads == 1 and self.fail_first:
+            raise ConnectionError("Airtable unavailable")
+        if self.reads == 1 and self.stall_first:
+            self.release.wait(10)
+        return [{"id": RECORD_ID, "fields": {"Name": "Invoice migration", "Status": self.status}}]
+
+    def update_record(self, table_name, record_id, fields):
+        self.status = fields["Status"]
+        return {"id": record_id, "fields": fields}
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeTable()
+    monkeypatch.setattr(airtable_service, "get_all_records", table.get_all_records)
+    monkeypatch.setattr(airtable_service, "update_record", table.update_record)
+    return table
+
+def _agent(client, run_timeout=180.0, profiler=None):
+    agent = Agent(
+        model="gpt-4o",
+        tools=[AirtableGetAllRecordsTool(), AirtableUpdateRecordTool()],
+        prefetch_tool="airtable_get_all_records",
+        resilience=ResiliencePolicy(run_timeout=run_timeout),
+        profiler=profiler,
+    )
+    agent.client = client
+    return agent
+
+def test_answers_the_first_matching_call_from_the_prefetch(table):
+    reply = _agent(ScriptedClient(("airtable_get_all_records", {}))).run("What's in my backlog?")
+    assert RECORD_ID in reply
+    assert table.reads == 1
+
+def test_profiles_calls_answered_from_the_prefetch(table, tmp_path):
+    profiler = RunProfiler(output_dir=str(tmp_path))
+    _agent(ScriptedClient(("airtable_get_all_records", {})), profiler=profiler).run("What's in my backlog?")
+
+    [report] = [name for name in os.listdir(tmp_path) if name.endswith(".txt")]
+    assert "airtable_get_all_records (prefetched): " in (tmp_path / report).read_text()
+
+def test_other_tool_calls_drop_the_prefetch(table):
+    client = ScriptedClient(
+        ("update_airtable_record", {"record_id": RECORD_ID, "fields": {"Status": "Done"}}),
+        ("airtable_get_all_records", {}),
+    )
+    reply = _agent(client).run("Mark the invoice task done and show the backlog")
+    # The list was read again after the update, so the reply doesn't show the stale status
+    assert table.reads == 2
+    assert "'Status': 'Done'" in reply
+
+def test_falls_back_to_the_tool_when_the_prefetch_fails(table):
+    table.fail_first = True
+    reply = _agent(ScriptedClient(("airtable_get_all_records", {}))).run("What's in my backlog?")
+    assert table.reads == 2
+    assert RECORD_ID in reply
+
+def test_stalled_prefetch_does_not_outlive_the_run_deadline(table):
+    table.stall_first = True
+    started = time.monotonic()
+    try:
+        with pytest.raises(AgentError, match="deadline"):
+            _agent(ScriptedClient(("airtable_get_all_records", {})), run_timeout=0.5).run("What's in my backlog?")
+    finally:
+        table.release.set()
+    assert time.monotonic() - started < 2
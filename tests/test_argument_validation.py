@@ -0,0 +1,41 @@
+import pytest
+
+from src.agents.custom.tools.airtable_schemas import build_fields_parameter, build_record_id_parameter
+from src.agents.custom.tools.argument_validation import ArgumentValidator, ToolArgumentError
+
+validator = ArgumentValidator("update_airtable_record", {
+    "type": "object",
+    "properties": {
+        "record_id": build_record_id_parameter("The ID of the record to update"),
+        "fields": build_fields_parameter(description="Fields to update"),
+    },
+    "additionalProperties": False,
+    "required": ["record_id", "fields"],
+})
+
+def test_normalizes_enum_case_and_dates():
+    args = validator.validate({
+        "record_id": " recABCDEFGHIJKLMN ",
+        "fields": {"Status": "in Progress", "Due date / time": "2024-12-31T23:59:00+02:00"},
+    })
+    assert args == {
+        "record_id": "recABCDEFGHIJKLMN",
+        "fields": {"Status": "In progress", "Due date / time": "2024-12-31T21:59:00.000Z"},
+    }
+
+def test_keeps_naive_dates_local():
+    args = validator.validate({"record_id": "recABCDEFGHIJKLMN", "fields": {"Due date / time": "2024-12-31T15:30"}})
+    assert args["fields"]["Due date / time"] == "2024-12-31T15:30:00"
+
+def test_rejects_bad_arguments_with_precise_errors():
+    with pytest.raises(ToolArgumentError) as excinfo:
+        validator.validate({
+            "record_id": "123",
+            "fields": {"Title": "x", "Status": "Blocked", "Due date / time": "next friday"},
+        })
+    errors = excinfo.value.errors
+    assert len(errors) == 4
+    assert any(error.startswith("fields: Additional properties") and "'Name'" in error for error in errors)
+    assert any(error.startswith("fields.Status:") for error in errors)
+    assert any(error.startswith("fields.Due date / time:") for error in errors)
+    assert any(error.startswith("record_id:") for error in errors)
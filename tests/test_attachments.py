@@ -0,0 +1,124 @@
+import asyncio
+import base64
+import io
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import src.services.airtable_service as airtable_service
+from interfaces.telegram_bot import TelegramInterface
+
+FILE = b"attachment bytes " * 10000
+
+@pytest.fixture
+def content_api(monkeypatch):
+    """Serve uploadAttachment locally, rate limiting the first request like Airtable does."""
+    bodies = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            bodies.append(body)
+            status = 429 if len(bodies) == 1 else 200
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(b'{"id": "recABCDEFGHIJKLMN", "fields": {}}')
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(airtable_service, "_CONTENT_API_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setattr(airtable_service, "_UPLOAD_TIMEOUT", (5, 5))
+    yield bodies
+    server.shutdown()
+
+def test_upload_resends_the_whole_body_after_a_429(content_api):
+    stream = io.BytesIO(b"header" + FILE)
+    stream.seek(len(b"header"))
+    airtable_service.upload_attachment("recABCDEFGHIJKLMN", "Attachments", stream, len(FILE), "a.bin", "application/octet-stream")
+
+    assert len(content_api) == 2
+    assert content_api[0] == content_api[1]
+    payload = json.loads(content_api[1])
+    assert payload["filename"] == "a.bin"
+    assert base64.b64decode(payload["file"]) == FILE
+
+@pytest.fixture
+def bot(monkeypatch):
+    """A bot whose Telegram download and Airtable calls are replaced by fakes."""
+    calls = SimpleNamespace(created=[], uploaded=[], deleted=[], replies=[], upload_error=None)
+
+    def create_record(table_name, fields):
+        calls.created.append(fields)
+        return {"id": "recNEWTASK0000001", "fields": fields}
+
+    def upload_attachment(record_id, field_name, stream, size, filename, content_type):
+        if calls.upload_error:
+            raise calls.upload_error
+        calls.uploaded.append((record_id, stream.read(), size, filename, content_type))
+
+    monkeypatch.setattr(airtable_service, "create_record", create_record)
+    monkeypatch.setattr(airtable_service, "upload_attachment", upload_attachment)
+    monkeypatch.setattr(airtable_service, "delete_record", lambda table_name, record_id: calls.deleted.append(record_id))
+
+    interface = TelegramInterface(bot_token="123456:TEST")
+
+    async def download_to(file_url, out):
+        out.write(FILE)
+        return len(FILE)
+
+    async def send_message_async(update, message):
+        calls.replies.append(message)
+
+    interface._download_to = download_to
+    interface.send_message_async = send_message_async
+    calls.interface = interface
+    return calls
+
+def _document_update(caption):
+    async def get_file():
+        return SimpleNamespace(file_path="https://api.telegram.org/file/bot123456:TEST/doc.pdf")
+
+    document = SimpleNamespace(
+        file_name="spec.pdf", file_unique_id="u1", mime_type="application/pdf", file_size=len(FILE), get_file=get_file
+    )
+    update = SimpleNamespace(
+        message=SimpleNamespace(caption=caption, document=document, photo=[]),
+        effective_chat=SimpleNamespace(id=1),
+    )
+
+    async def send_chat_action(**kwargs):
+        pass
+
+    return update, SimpleNamespace(bot=SimpleNamespace(send_chat_action=send_chat_action))
+
+def test_spools_the_download_into_a_new_task(bot):
+    asyncio.run(bot.interface._handle_attachment(*_document_update("Read the spec")))
+
+    assert bot.created == [{"Name": "Read the spec", "Notes": "Created from spec.pdf sent via Telegram."}]
+    assert bot.uploaded == [("recNEWTASK0000001", FILE, len(FILE), "spec.pdf", "application/pdf")]
+    assert bot.deleted == []
+    assert bot.replies == ["📎 Attached **spec.pdf** to task `recNEWTASK0000001`"]
+
+def test_deletes_the_created_task_when_the_upload_fails(bot):
+    bot.upload_error = ConnectionError("upload failed")
+    asyncio.run(bot.interface._handle_attachment(*_document_update("Read the spec")))
+
+    assert bot.deleted == ["recNEWTASK0000001"]
+    assert bot.replies == ["❌ Sorry, I couldn't attach spec.pdf: upload failed"]
+
+def test_keeps_existing_tasks_when_the_upload_fails(bot):
+    bot.upload_error = ConnectionError("upload failed")
+    asyncio.run(bot.interface._handle_attachment(*_document_update("For recEXISTING000001")))
+
+    assert bot.created == []
+    assert bot.deleted == []
@@ -0,0 +1,119 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import src.services.airtable_service as airtable_service
+from src.agents.custom.agent import AgentError
+from src.agents.custom.backlog_review import BacklogReviewer
+from src.agents.custom.tools.airtable_get_all_records_tool import AirtableGetAllRecordsTool, MAX_RECORDS_IN_RESULT
+from src.agents.custom.tools.airtable_review_backlog_tool import AirtableReviewBacklogTool
+
+def _record(number, status="Todo", due=None):
+    fields = {"Name": f"Task {number}", "Status": status}
+    if due:
+        fields["Due date / time"] = due
+    return {"id": f"rec{number:014d}", "fields": fields}
+
+def _response(content):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+class FakeAgent:
+    """Flags the first record of each chunk for deletion, or fails on a chosen chunk."""
+
+    system_message = "system"
+
+    def __init__(self, fail_on_chunk=None):
+        self.fail_on_chunk = fail_on_chunk
+        self.chunks = []
+        self.lock = threading.Lock()
+
+    def complete(self, messages, deadline=None, **options):
+        if "response_format" not in options:
+            return _response("summary")
+        lines = messages[-1]["content"].splitlines()
+        with self.lock:
+            self.chunks.append(len(lines))
+            number = len(self.chunks)
+        if number == self.fail_on_chunk:
+            raise AgentError("model unavailable")
+        record_id = lines[0].split(" | ")[0]
+        return _response(json.dumps({
+            "cleanup_candidates": [
+                {"record_id": record_id, "action": "delete", "reason": "done"},
+                {"record_id": "recNOTINTHISCHUNK", "action": "delete", "reason": "hallucinated"},
+            ],
+            "themes": ["billing"],
+        }))
+
+@pytest.fixture
+def pages(monkeypatch):
+    """Serve records in pages of 3 and count how many pages were read."""
+    state = SimpleNamespace(records=[], pages_read=0)
+
+    def iterate_records(table_name, page_size=100):
+        for start in range(0, len(state.records), 3):
+            state.pages_read += 1
+            yield state.records[start:start + 3]
+
+    monkeypatch.setattr(airtable_service, "iterate_records", iterate_records)
+    return state
+
+def test_chunks_and_merges_reviews(pages):
+    pages.records = [_record(1, "Done"), _record(2, due="2000-01-01"), *[_record(n) for n in range(3, 8)]]
+    agent = FakeAgent()
+    review = BacklogReviewer(agent, chunk_size=4, max_concurrency=2).review("Summarize")
+
+    assert sorted(agent.chunks) == [3, 4]
+    assert review.summary == "summary"
+    assert review.total == 7
+    assert review.status_counts == {"Done": 1, "Todo": 6}
+    assert len(review.overdue) == 1 and review.overdue[0].startswith(_record(2)["id"])
+    # Candidates are kept in chunk order, and IDs outside their chunk are dropped
+    assert [candidate["record_id"] for candidate in review.cleanup_candidates] == [_record(1)["id"], _record(5)["id"]]
+
+def test_flags_duplicates_across_chunks(pages):
+    pages.records = [_record(n) for n in range(1, 7)]
+    pages.records[3]["fields"]["Name"] = "Task 1"  # Already flagged by the model
+    pages.records[4]["fields"]["Name"] = "Task 2"
+    pages.records[5]["fields"]["Name"] = " task  2!"
+    review = BacklogReviewer(FakeAgent(), chunk_size=3, max_concurrency=2).collect()
+
+    assert [(candidate["record_id"], candidate["action"]) for candidate in review.cleanup_candidates] == [
+        (_record(1)["id"], "delete"),
+        (_record(4)["id"], "delete"),
+        (_record(5)["id"], "merge"),
+        (_record(6)["id"], "merge"),
+    ]
+    assert review.cleanup_candidates[2]["reason"] == f"Same name as {_record(2)['id']}"
+
+def test_stops_reading_after_a_chunk_fails(pages):
+    pages.records = [_record(n) for n in range(1, 301)]
+    agent = FakeAgent(fail_on_chunk=1)
+
+    with pytest.raises(AgentError, match="model unavailable"):
+        BacklogReviewer(agent, chunk_size=3, max_concurrency=1).collect()
+    assert pages.pages_read < 5
+    assert len(agent.chunks) < 5
+
+def test_review_tool_returns_bounded_findings(pages):
+    pages.records = [_record(n) for n in range(1, 1001)]
+    tool = AirtableReviewBacklogTool(BacklogReviewer(FakeAgent(), chunk_size=5))
+
+    findings = json.loads(tool())
+    assert findings["total_records"] == 1000
+    assert findings["cleanup_candidate_count"] == 200
+    assert len(findings["cleanup_candidates"]) < 200
+
+def test_get_all_records_truncates_large_backlogs(monkeypatch):
+    records = [_record(n) for n in range(1, 1001)]
+    monkeypatch.setattr(airtable_service, "get_all_records", lambda table_name: records)
+
+    result = AirtableGetAllRecordsTool()()
+    assert result.startswith(f"Showing {MAX_RECORDS_IN_RESULT} of 1000 record(s)")
+    assert len(result.splitlines()) == MAX_RECORDS_IN_RESULT + 2
+    assert "review_backlog" in result
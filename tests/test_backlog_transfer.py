@@ -0,0 +1,100 @@
+import json
+import os
+
+import pytest
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import src.services.airtable_service as airtable_service
+from src.services.backlog_transfer import export_records, import_records
+
+class FakeUpsert:
+    """Records each batch, optionally failing on a given call."""
+
+    def __init__(self, fail_on_call=None):
+        self.fail_on_call = fail_on_call
+        self.batches = []
+
+    def __call__(self, table_name, records, key_fields, typecast=False):
+        if len(self.batches) + 1 == self.fail_on_call:
+            self.fail_on_call = None
+            raise ConnectionError("Airtable unavailable")
+        self.batches.append([dict(fields) for fields in records])
+        return {"records": []}
+
+    @property
+    def names(self):
+        return [fields["Name"] for batch in self.batches for fields in batch]
+
+def _write_jsonl(path, names):
+    with open(path, "w", encoding="utf-8") as f:
+        for name in names:
+            f.write(json.dumps({"Name": name, "Status": "Todo"}) + "\n")
+
+def test_resumes_after_a_failure_mid_import(tmp_path, monkeypatch):
+    path = str(tmp_path / "backlog.jsonl")
+    _write_jsonl(path, [f"Task {n}" for n in range(25)])
+
+    upsert = FakeUpsert(fail_on_call=2)
+    monkeypatch.setattr(airtable_service, "batch_upsert_records", upsert)
+    with pytest.raises(ConnectionError):
+        import_records("Backlog", path, show_progress=False)
+    assert upsert.names == [f"Task {n}" for n in range(10)]
+    assert os.path.exists(f"{path}.checkpoint")
+
+    assert import_records("Backlog", path, show_progress=False) == 15
+    assert upsert.names == [f"Task {n}" for n in range(25)]
+    assert not os.path.exists(f"{path}.checkpoint")
+
+def test_ignores_checkpoint_after_the_file_changes(tmp_path, monkeypatch):
+    path = str(tmp_path / "backlog.jsonl")
+    _write_jsonl(path, [f"Task {n}" for n in range(25)])
+
+    monkeypatch.setattr(airtable_service, "batch_upsert_records", FakeUpsert(fail_on_call=2))
+    with pytest.raises(ConnectionError):
+        import_records("Backlog", path, show_progress=False)
+
+    _write_jsonl(path, [f"Edited {n}" for n in range(30)])
+    upsert = FakeUpsert()
+    monkeypatch.setattr(airtable_service, "batch_upsert_records", upsert)
+    assert import_records("Backlog", path, show_progress=False) == 30
+    assert upsert.names[0] == "Edited 0"
+
+def test_never_sends_a_key_twice_in_one_batch(tmp_path, monkeypatch):
+    path = str(tmp_path / "backlog.jsonl")
+    _write_jsonl(path, ["A", "B", "A", "C", "C", "D"])
+
+    upsert = FakeUpsert()
+    monkeypatch.setattr(airtable_service, "batch_upsert_records", upsert)
+    assert import_records("Backlog", path, show_progress=False) == 6
+    assert [[fields["Name"] for fields in batch] for batch in upsert.batches] == [["A", "B"], ["A", "C"], ["C", "D"]]
+
+def test_csv_round_trip_keeps_attachments(tmp_path, monkeypatch):
+    attachment = {
+        "id": "attABCDEFGHIJKLMN",
+        "url": "https://v5.airtableusercontent.com/file.png",
+        "filename": "file.png",
+        "size": 1024,
+        "type": "image/png",
+        "thumbnails": {"small": {"url": "https://v5.airtableusercontent.com/small.png", "width": 36, "height": 36}},
+    }
+    record = {
+        "id": "recABCDEFGHIJKLMN",
+        "createdTime": "2024-01-01T00:00:00.000Z",
+        "fields": {"Name": "Design review, v2", "Notes": "Line one\nLine two", "Attachments": [attachment]},
+    }
+    monkeypatch.setattr(airtable_service, "iterate_records", lambda table_name: iter([[record]]))
+    path = str(tmp_path / "backlog.csv")
+    assert export_records("Backlog", path, show_progress=False) == 1
+
+    upsert = FakeUpsert()
+    monkeypatch.setattr(airtable_service, "batch_upsert_records", upsert)
+    assert import_records("Backlog", path, show_progress=False) == 1
+
+    # Read-only attachment properties are dropped; Airtable fetches the file from its url
+    assert upsert.batches == [[{
+        "Name": "Design review, v2",
+        "Notes": "Line one\nLine two",
+        "Attachments": [{"url": attachment["url"], "filename": "file.png"}],
+    }]]
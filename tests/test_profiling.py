@@ -0,0 +1,31 @@
+import os
+import tracemalloc
+
+from src.agents.custom.profiling import RunProfiler
+
+def _fake_run(profiler, prompt):
+    with profiler.profile_run(prompt) as profile:
+        if profile is not None:
+            with profile.tool("create_airtable_record"):
+                data = [str(i) for i in range(10000)]
+            profile.record_messages([{"role": "user", "content": prompt}, {"role": "tool", "content": "ok"}])
+        return profile
+
+def test_writes_report_for_sampled_runs(tmp_path):
+    profiler = RunProfiler(output_dir=str(tmp_path), every_n=2)
+    profiles = [_fake_run(profiler, f"run {i}") for i in range(4)]
+
+    assert [profile is not None for profile in profiles] == [False, True, False, True]
+    reports = sorted(name for name in os.listdir(tmp_path) if name.endswith(".txt"))
+    assert len(reports) == 2
+    report = (tmp_path / reports[0]).read_text()
+    assert "create_airtable_record" in report
+    assert "Messages: 2" in report
+    assert "cumulative" in report
+    assert not tracemalloc.is_tracing()
+
+def test_toggle_disables_sampling(tmp_path):
+    profiler = RunProfiler(output_dir=str(tmp_path))
+    assert profiler.toggle() is False
+    assert _fake_run(profiler, "run") is None
+    assert os.listdir(tmp_path) == []
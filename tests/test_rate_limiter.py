@@ -0,0 +1,79 @@
+import struct
+import threading
+import time
+from types import SimpleNamespace
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import src.services.airtable_service as airtable_service
+from src.services.rate_limiter import FileRateLimiter, PRIORITY_BULK, ProcessRateLimiter, priority
+
+def test_spaces_calls_within_a_process():
+    limiter = ProcessRateLimiter(rate=20)
+    started = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    assert time.monotonic() - started >= 4 / 20
+
+def test_file_limiter_is_shared_between_instances(tmp_path):
+    # Two instances on the same file behave like two processes sharing the limit
+    path = str(tmp_path / "airtable.ratelimit")
+    first, second = FileRateLimiter(20, path), FileRateLimiter(20, path)
+    started = time.monotonic()
+    for _ in range(3):
+        first.acquire()
+        second.acquire()
+    assert time.monotonic() - started >= 5 / 20
+
+def test_bulk_callers_yield_to_interactive(tmp_path):
+    path = str(tmp_path / "airtable.ratelimit")
+    limiter = FileRateLimiter(10, path)
+    order = []
+
+    def bulk_job():
+        with priority(PRIORITY_BULK):
+            for _ in range(3):
+                limiter.acquire()
+                order.append("bulk")
+
+    limiter.acquire()  # Occupy the current slot so the next ones are contended
+    worker = threading.Thread(target=bulk_job)
+    worker.start()
+    time.sleep(0.01)
+    for _ in range(3):
+        limiter.acquire()
+        order.append("interactive")
+    worker.join()
+
+    assert order[:3] == ["interactive"] * 3
+
+def test_file_limiter_keeps_long_queues_but_ignores_state_from_before_a_reboot(tmp_path):
+    path = str(tmp_path / "airtable.ratelimit")
+    limiter = FileRateLimiter(5, path)
+    origin = time.time() - time.monotonic()
+
+    # A queue stretching minutes ahead is legitimate and must be kept
+    with open(path, "wb") as f:
+        f.write(struct.pack("dd", time.monotonic() + 120, origin))
+    with limiter._next_slot() as slot:
+        assert slot[0] > time.monotonic() + 60
+
+    # The same slot booked under another clock origin predates a reboot
+    with open(path, "wb") as f:
+        f.write(struct.pack("dd", time.monotonic() + 120, origin - 3600))
+    started = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - started < 0.1
+
+def test_full_reads_take_a_token_per_page(monkeypatch):
+    pages = [[{"id": f"rec{page}{n}", "fields": {}} for n in range(100)] for page in range(3)]
+    table = SimpleNamespace(iterate=lambda page_size: iter(pages))
+    acquired = []
+    monkeypatch.setattr(airtable_service, "base", SimpleNamespace(table=lambda name: table))
+    monkeypatch.setattr(airtable_service, "_rate_limiter", SimpleNamespace(acquire=lambda: acquired.append(1)))
+
+    assert len(airtable_service.get_all_records("Backlog")) == 300
+    # One token per page request, plus the one that finds no further page
+    assert len(acquired) == 4
@@ -0,0 +1,106 @@
+import json
+import threading
+
+import httpx
+import openai
+import pytest
+from dotenv import load_dotenv
+from openai.types.chat import ChatCompletion
+
+load_dotenv()
+
+import src.services.airtable_service as airtable_service
+from src.harness.cassette import AIRTABLE_FUNCTIONS, KIND_AIRTABLE, KIND_OPENAI, TrafficRecorder, load_cassettes
+from src.harness.replay import ReplayInterface, run_load
+
+RECORDS = [
+    {"id": "recINVOICE000001", "fields": {"Name": "Invoice migration", "Status": "Todo"}},
+    {"id": "recVENUE00000001", "fields": {"Name": "Book venue", "Status": "Done"}},
+]
+
+def _completion(message):
+    return ChatCompletion.model_validate({
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", **message}}],
+    })
+
+class ScriptedClient:
+    """Searches for the prompt, then answers with the last line of the search results."""
+
+    def __init__(self, fail_first=False):
+        self.fail_first = fail_first
+        self.calls = 0
+        self.lock = threading.Lock()
+        self.chat = self
+        self.completions = self
+
+    def create(self, messages, **kwargs):
+        with self.lock:
+            self.calls += 1
+            if self.fail_first and self.calls == 1:
+                raise openai.APITimeoutError(request=httpx.Request("POST", "https://api.openai.com"))
+        last = messages[-1]
+        if last["role"] == "user":
+            return _completion({"content": None, "tool_calls": [{
+                "id": "call_1",
+                "type": "function",
+                "function": {"name": "search_tasks", "arguments": json.dumps({"query": last["content"]})},
+            }]})
+        return _completion({"content": f"Found: {last['content'].splitlines()[-1]}"})
+
+@pytest.fixture
+def fake_airtable(monkeypatch):
+    """Serve a fixed table, restoring the service functions the recorder and replay patch."""
+    created = []
+    monkeypatch.setenv("AGENT_BACKLOG_PREFETCH", "off")
+    monkeypatch.setattr(airtable_service, "_search_indexes", {})
+    for name in AIRTABLE_FUNCTIONS:
+        monkeypatch.setattr(airtable_service, name, getattr(airtable_service, name))
+    monkeypatch.setattr(airtable_service, "iterate_records", lambda table_name, page_size=100: iter([RECORDS]))
+    monkeypatch.setattr(airtable_service, "get_all_records", lambda table_name: RECORDS)
+    monkeypatch.setattr(airtable_service, "create_record", lambda table_name, fields: created.append(fields))
+    return created
+
+def _recording_interface(tmp_path, client):
+    interface = ReplayInterface()
+    interface.agent.client = client
+    TrafficRecorder(str(tmp_path)).attach(interface.agent)
+    return interface
+
+def test_concurrent_runs_get_their_own_cassettes(tmp_path, fake_airtable):
+    interface = _recording_interface(tmp_path, ScriptedClient(fail_first=True))
+
+    threads = [threading.Thread(target=interface.process_user_input, args=(prompt,)) for prompt in ("invoice", "venue")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Calls made outside a run, e.g. by an attachment upload, belong to no cassette
+    airtable_service.create_record("Backlog", {"Name": "Unrelated"})
+    assert fake_airtable == [{"Name": "Unrelated"}]
+
+    cassettes = {cassette.prompt: cassette for cassette in load_cassettes(str(tmp_path))}
+    assert set(cassettes) == {"invoice", "venue"}
+    for prompt, cassette in cassettes.items():
+        kinds = [event["kind"] for event in cassette.events]
+        # One event per completed model call, even though the first attempt was retried
+        assert kinds == [KIND_OPENAI, KIND_AIRTABLE, KIND_OPENAI]
+        assert cassette.events[1]["function"] == "search_records"
+        assert cassette.events[1]["args"] == ["Backlog", prompt, 5]
+        assert cassette.reply.startswith(f"Found: rec{prompt.upper()}")
+
+def test_replays_recorded_sessions_in_a_fresh_process(tmp_path, fake_airtable):
+    interface = _recording_interface(tmp_path, ScriptedClient())
+    replies = [interface.process_user_input(prompt) for prompt in ("invoice", "venue")]
+    assert all(reply.startswith("Found: rec") for reply in replies)
+
+    # The index was built during the first run; a fresh process replaying the second has none
+    airtable_service._search_indexes.clear()
+    cassettes = [cassette for cassette in load_cassettes(str(tmp_path)) if cassette.prompt == "venue"]
+    report = run_load(cassettes, sessions=4, arrival_rate=1000, concurrency=2, latency_scale=0, seed=1)
+    assert report.errors == 0
+    assert report.diverged == 0
+    assert len(report.latencies) == 4
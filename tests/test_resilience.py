@@ -0,0 +1,118 @@
+import threading
+import time
+
+import httpx
+import openai
+import pytest
+
+from src.agents.custom.resilience import DeadlineExceededError, ResiliencePolicy, ResilientCaller
+
+def _timeout_error():
+    return openai.APITimeoutError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+
+def test_retries_transient_errors_then_succeeds():
+    sleeps = []
+    caller = ResilientCaller(ResiliencePolicy(max_retries=2), sleep=sleeps.append)
+    attempts = []
+
+    def flaky(timeout):
+        attempts.append(timeout)
+        if len(attempts) < 3:
+            raise _timeout_error()
+        return "ok"
+
+    assert caller.call(flaky) == "ok"
+    assert len(attempts) == 3
+    assert len(sleeps) == 2
+
+def test_does_not_retry_permanent_errors():
+    caller = ResilientCaller(ResiliencePolicy(max_retries=3), sleep=lambda _: None)
+    attempts = []
+
+    def broken(timeout):
+        attempts.append(timeout)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        caller.call(broken)
+    assert len(attempts) == 1
+
+def test_respects_run_deadline():
+    caller = ResilientCaller(ResiliencePolicy(step_timeout=30), sleep=lambda _: None)
+    with pytest.raises(DeadlineExceededError):
+        caller.call(lambda timeout: "never", deadline=time.monotonic() - 1)
+
+    timeouts = []
+    caller.call(lambda timeout: timeouts.append(timeout), deadline=time.monotonic() + 5)
+    assert timeouts[0] <= 5
+
+def test_retries_stop_at_the_step_deadline():
+    now = [0.0]
+    policy = ResiliencePolicy(step_timeout=10, step_deadline=25, run_timeout=180, max_retries=10, backoff_base=1)
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    caller = ResilientCaller(policy, sleep=sleep, clock=lambda: now[0])
+    timeouts = []
+
+    def times_out(timeout):
+        timeouts.append(timeout)
+        now[0] += timeout
+        raise _timeout_error()
+
+    with pytest.raises(DeadlineExceededError, match="Step deadline"):
+        caller.call(times_out, deadline=caller.deadline())
+    assert now[0] <= 25
+    assert len(timeouts) < 4
+
+def test_hedges_slow_requests_within_budget():
+    policy = ResiliencePolicy(hedge=True, hedge_min_samples=5, hedge_min_delay=0.01, hedge_budget=0.5)
+    caller = ResilientCaller(policy)
+    for _ in range(5):
+        caller.latencies.record(0.01)
+
+    calls = []
+    lock = threading.Lock()
+
+    def first_call_stalls(timeout):
+        with lock:
+            calls.append(timeout)
+            index = len(calls)
+        if index == 1:
+            time.sleep(1)
+            return "slow"
+        return "fast"
+
+    started = time.monotonic()
+    assert caller.call(first_call_stalls) == "fast"
+    assert time.monotonic() - started < 0.5
+    assert len(calls) == 2
+
+    # The hedge token was spent, so the next slow call just waits for the primary
+    calls.clear()
+    assert caller.call(first_call_stalls) == "slow"
+    assert len(calls) == 1
+
+def test_stragglers_do_not_delay_new_requests():
+    policy = ResiliencePolicy(hedge=True, hedge_min_samples=5, hedge_min_delay=0.01, hedge_budget=1.0)
+    caller = ResilientCaller(policy)
+    for _ in range(5):
+        caller.latencies.record(0.01)
+
+    def primary_stalls():
+        attempts = []
+
+        def fn(timeout):
+            attempts.append(timeout)
+            if len(attempts) == 1:
+                time.sleep(1)
+                return "slow"
+            return "fast"
+        return fn
+
+    # Each call leaves its stalled primary running; more stragglers than any small pool
+    started = time.monotonic()
+    results = [caller.call(primary_stalls()) for _ in range(8)]
+    assert results == ["fast"] * 8
+    assert time.monotonic() - started < 0.8
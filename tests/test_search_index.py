@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import src.services.airtable_service as airtable_service
+from src.services.search_index import SearchIndex
+
+def _record(record_id, name, notes="", status="Todo"):
+    return {"id": record_id, "fields": {"Name": name, "Notes": notes, "Status": status}}
+
+def _index():
+    index = SearchIndex()
+    index.rebuild([
+        _record("rec1", "Invoice migration", "Move invoices from the legacy billing system"),
+        _record("rec2", "Update documentation", "Describe the new invoice export"),
+        _record("rec3", "Team offsite", "Book a venue"),
+    ])
+    return index
+
+def test_ranks_by_relevance():
+    hits = _index().search("invoice migration")
+    assert [hit.record_id for hit in hits] == ["rec1", "rec2"]
+    assert hits[0].name == "Invoice migration"
+    assert hits[0].status == "Todo"
+    assert "invoices" in hits[0].snippet
+
+def test_limit_and_no_match():
+    index = _index()
+    assert len(index.search("invoice", limit=1)) == 1
+    assert index.search("kubernetes") == []
+    assert index.search("") == []
+
+def test_incremental_updates():
+    index = _index()
+    index.upsert(_record("rec3", "Invoice offsite", "Celebrate the migration", status="Done"))
+    assert {hit.record_id for hit in index.search("migration")} == {"rec1", "rec3"}
+    assert index.search("venue") == []
+
+    index.remove("rec1")
+    assert [hit.record_id for hit in index.search("migration")] == ["rec3"]
+    assert len(index) == 2
+
+    index.upsert(_record("rec4", "Venue booking"))
+    assert len(index) == 3
+    assert [hit.record_id for hit in index.search("venue")] == ["rec4"]
+
+def test_sync_only_touches_changed_records():
+    index = _index()
+    records = [
+        _record("rec1", "Invoice migration", "Move invoices from the legacy billing system"),
+        _record("rec2", "Update documentation", "Describe the new invoice export", status="Done"),
+        _record("rec4", "Venue booking"),
+    ]
+    assert index.sync(records) == 3  # rec2 changed, rec4 added, rec3 removed
+    assert index.sync(records) == 0
+    assert [hit.status for hit in index.search("documentation")] == ["Done"]
+    assert index.search("offsite") == []
+    assert len(index) == 3
+
+def test_writes_during_the_initial_build_reach_the_index(monkeypatch):
+    table = SimpleNamespace(
+        create=lambda fields: {"id": "recNEW", "fields": fields},
+        update=lambda record_id, fields: {"id": record_id, "fields": fields},
+    )
+    monkeypatch.setattr(airtable_service, "base", SimpleNamespace(table=lambda name: table))
+    monkeypatch.setattr(airtable_service, "_search_indexes", {})
+
+    def iterate_records(table_name, page_size=100):
+        yield [_record("rec1", "Invoice migration")]
+        # Other requests keep writing while the table is being read
+        airtable_service.create_record(table_name, {"Name": "Venue booking"})
+        airtable_service.update_record(table_name, "rec2", {"Name": "Invoice export", "Status": "Done"})
+        yield [_record("rec2", "Update documentation")]
+
+    monkeypatch.setattr(airtable_service, "iterate_records", iterate_records)
+    index = airtable_service.get_search_index("Backlog")
+
+    assert [hit.record_id for hit in index.search("venue")] == ["recNEW"]
+    assert [hit.status for hit in index.search("export")] == ["Done"]
+    assert index.search("documentation") == []
+
+def test_full_reads_do_not_undo_writes_made_during_them(monkeypatch):
+    index = _index()
+    monkeypatch.setattr(airtable_service, "_search_indexes", {"Backlog": index})
+    table = SimpleNamespace(
+        create=lambda fields: {"id": "recNEW", "fields": fields},
+        update=lambda record_id, fields: {"id": record_id, "fields": fields},
+        delete=lambda record_id: {"id": record_id, "deleted": True},
+    )
+    monkeypatch.setattr(airtable_service, "base", SimpleNamespace(table=lambda name: table))
+
+    def iterate_records(table_name, page_size=100):
+        # The read returns the table as it was when it started...
+        snapshot = [
+            _record("rec1", "Invoice migration"),
+            _record("rec2", "Update documentation"),
+            _record("rec3", "Plan the offsite"),
+            _record("rec4", "Archive old invoices", status="Done"),
+        ]
+        # ...while this process writes to it
+        airtable_service.update_record(table_name, "rec2", {"Name": "Update documentation", "Status": "Done"})
+        airtable_service.create_record(table_name, {"Name": "Venue booking"})
+        airtable_service.delete_record(table_name, "rec3")
+        yield snapshot
+
+    monkeypatch.setattr(airtable_service, "iterate_records", iterate_records)
+    airtable_service.get_all_records("Backlog")
+
+    assert [hit.status for hit in index.search("documentation")] == ["Done"]
+    assert [hit.record_id for hit in index.search("venue")] == ["recNEW"]
+    assert index.search("offsite") == []
+    # Changes the read did pick up from elsewhere are still applied
+    assert [hit.status for hit in index.search("archive")] == ["Done"]
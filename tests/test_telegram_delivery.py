@@ -0,0 +1,105 @@
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+from telegram.error import BadRequest, RetryAfter
+
+import interfaces.telegram_delivery as telegram_delivery
+from interfaces.telegram_delivery import TelegramOutbox, _is_balanced, split_message
+
+def test_short_messages_are_not_split():
+    assert split_message("*hello*", limit=50) == ["*hello*"]
+
+def test_splits_at_paragraph_boundaries():
+    paragraphs = ["*Status* " + "a" * 30, "_Overdue_ " + "b" * 30, "Tips " + "c" * 30]
+    chunks = split_message("\n\n".join(paragraphs), limit=90)
+    assert chunks == ["\n\n".join(paragraphs[:2]), paragraphs[2]]
+
+def test_does_not_cut_inside_entities():
+    text = "\n".join(["intro line", "*bold starts", "still bold*", "tail"])
+    chunks = split_message(text, limit=30)
+    assert all(len(chunk) <= 30 for chunk in chunks)
+    assert all(_is_balanced(chunk) for chunk in chunks)
+    assert "\n".join(chunks) == text
+
+def test_reopens_split_code_blocks():
+    code = "```python\n" + "\n".join(f"line_{i} = {i}" for i in range(20)) + "\n```"
+    chunks = split_message(code, limit=80)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert len(chunk) <= 80
+        assert chunk.startswith("```python\n") and chunk.endswith("\n```")
+
+def test_reopens_code_blocks_that_follow_text_without_a_blank_line():
+    rows = "\n".join(f"row {i}, value {i * 3}" for i in range(60))
+    chunks = split_message(f"Here is the export:\n```\n{rows}\n```\nLet me know.", limit=200)
+    assert len(chunks) > 2
+    assert chunks[0] == "Here is the export:"
+    for chunk in chunks[1:]:
+        assert len(chunk) <= 200
+        assert chunk.startswith("```\n") and chunk.count("```") == 2
+    assert chunks[-1].endswith("```\n\nLet me know.")
+
+def test_counts_emoji_as_two_units():
+    chunks = split_message("🚀" * 30, limit=20)
+    assert all(len(chunk.encode("utf-16-le")) // 2 <= 20 for chunk in chunks)
+    assert "".join(chunks) == "🚀" * 30
+
+class FakeBot:
+    """Records delivered messages, raising queued errors first."""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.sent = []
+
+    async def send_message(self, chat_id, text, parse_mode):
+        await asyncio.sleep(0)
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append((chat_id, text, parse_mode, time.monotonic()))
+
+@pytest.fixture
+def no_chat_interval(monkeypatch):
+    monkeypatch.setattr(telegram_delivery, "PRIVATE_CHAT_SEND_INTERVAL", 0.0)
+
+def test_pauses_the_chat_on_retry_after(no_chat_interval):
+    bot = FakeBot([RetryAfter(timedelta(seconds=0.3))])
+
+    async def main():
+        start = time.monotonic()
+        await TelegramOutbox(bot).send(1, "hello")
+        return start
+
+    start = asyncio.run(main())
+    assert [text for _, text, _, _ in bot.sent] == ["hello"]
+    assert bot.sent[0][3] - start >= 0.3
+
+def test_falls_back_to_plain_text_when_markdown_is_rejected(no_chat_interval):
+    bot = FakeBot([BadRequest("Can't parse entities: can't find end of the entity")])
+    asyncio.run(TelegramOutbox(bot).send(1, "*unbalanced"))
+    assert [(text, parse_mode) for _, text, parse_mode, _ in bot.sent] == [("*unbalanced", None)]
+
+def test_other_bad_requests_are_not_retried(no_chat_interval):
+    bot = FakeBot([BadRequest("Chat not found")])
+    with pytest.raises(BadRequest):
+        asyncio.run(TelegramOutbox(bot).send(1, "hello"))
+    assert bot.sent == []
+
+def test_keeps_per_chat_order(no_chat_interval):
+    bot = FakeBot()
+    long_reply = "\n\n".join(f"paragraph {i} " + "x" * 1500 for i in range(6))
+
+    async def main():
+        outbox = TelegramOutbox(bot)
+        await asyncio.gather(
+            outbox.send(1, long_reply),
+            outbox.send(2, "other chat"),
+            outbox.send(1, "follow-up"),
+        )
+
+    asyncio.run(main())
+    chunks = split_message(long_reply)
+    assert len(chunks) > 1
+    assert [text for chat_id, text, _, _ in bot.sent if chat_id == 1] == [*chunks, "follow-up"]
+    assert [text for chat_id, text, _, _ in bot.sent if chat_id == 2] == ["other chat"]